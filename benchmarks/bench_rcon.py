@@ -0,0 +1,145 @@
+"""
+Benchmarks del camino RCON contra el servidor falso de benchmarks.fake_rcon_server.
+
+Mide latencia p50/p99 y rendimiento de:
+- connect+auth: abrir la conexión y autenticarse.
+- single: comandos secuenciales sobre una conexión.
+- large: respuestas fragmentadas (comando `help`).
+- concurrent-pool / concurrent-multiplex: comandos concurrentes.
+- status: get_minecraft_server_status tal y como lo usan los comandos del bot
+  (con caché) y forzando un sondeo nuevo en cada llamada.
+
+Uso:
+    python -m benchmarks.bench_rcon [--iterations N] [--concurrency C] [--latency S]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from servercontrol.discord.rcon_client import RCONPool, SimpleRCONClient
+
+from .fake_rcon_server import FakeRCONServer
+
+PASSWORD = "password"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre muestras ya ordenadas."""
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+def report_pool(name: str, pool: RCONPool):
+    stats = pool.stats
+    print(
+        f"{name:<22} pool: {stats.acquires} adquisiciones, "
+        f"reutilización {stats.reuse_ratio:.1%}, "
+        f"{stats.connections_created} conexiones creadas, "
+        f"{stats.reconnects} reconexiones, "
+        f"espera media {stats.avg_wait * 1000:.3f} ms, "
+        f"máx. {stats.max_wait * 1000:.3f} ms"
+    )
+
+
+def report(name: str, samples: list[float], wall: float):
+    samples.sort()
+    print(
+        f"{name:<22} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:8.3f} ms  "
+        f"p99={percentile(samples, 99) * 1000:8.3f} ms  "
+        f"{len(samples) / wall:10,.0f} ops/s"
+    )
+
+
+async def measure(
+    name: str,
+    operation: Callable[[], Awaitable[object]],
+    iterations: int,
+    concurrency: int = 1,
+):
+    """Ejecuta `operation` `iterations` veces repartidas entre `concurrency` tareas."""
+    samples: list[float] = []
+
+    async def worker(count: int):
+        for _ in range(count):
+            start = time.perf_counter()
+            await operation()
+            samples.append(time.perf_counter() - start)
+
+    per_worker = max(1, iterations // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    report(name, samples, time.perf_counter() - start)
+
+
+async def main(iterations: int, concurrency: int, latency: float):
+    async with FakeRCONServer(password=PASSWORD, latency=latency) as server:
+        host, port = server.host, server.port
+        print(f"Servidor falso en {host}:{port} (latencia {latency * 1000:.1f} ms)")
+
+        async def connect_auth():
+            async with SimpleRCONClient(host, port, PASSWORD):
+                pass
+
+        await measure("connect+auth", connect_auth, iterations)
+
+        async with SimpleRCONClient(host, port, PASSWORD) as client:
+            await measure("single", lambda: client.execute("list"), iterations)
+            await measure(
+                "large", lambda: client.execute("help"), max(1, iterations // 10)
+            )
+
+        pool = RCONPool(host, port, PASSWORD, max_size=concurrency)
+        await measure(
+            "concurrent-pool", lambda: pool.execute("list"), iterations, concurrency
+        )
+        report_pool("concurrent-pool", pool)
+        await pool.close()
+
+        async with SimpleRCONClient(host, port, PASSWORD, multiplex=True) as client:
+            await measure(
+                "concurrent-multiplex",
+                lambda: client.execute("list"),
+                iterations,
+                concurrency,
+            )
+
+        # Importado aquí: arrastra discord.py y la configuración del bot.
+        from servercontrol.config import MinecraftConfig
+        from servercontrol.discord.commands import (
+            get_minecraft_server_status,
+            get_rcon_pool,
+        )
+
+        config = MinecraftConfig(
+            rcon_host=host,
+            rcon_port=port,
+            rcon_password=PASSWORD,
+            server_path=".",
+            status_probe="rcon",
+        )  # type: ignore
+        await measure(
+            "status",
+            lambda: get_minecraft_server_status(config),
+            iterations,
+            concurrency,
+        )
+        await measure(
+            "status-forced",
+            lambda: get_minecraft_server_status(config, force=True),
+            iterations,
+            concurrency,
+        )
+        report_pool("status", get_rcon_pool(config))
+        await get_rcon_pool(config).close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.concurrency, args.latency))
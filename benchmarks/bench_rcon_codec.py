@@ -0,0 +1,148 @@
+"""
+Micro-benchmark del códec de paquetes RCON.
+
+Compara la implementación anterior (concatenación de bytes, una escritura por
+paquete y dos `readexactly` con su propio `wait_for`) con RCONPacketEncoder /
+RCONFrameReader. Cada comando se envía junto a su paquete centinela, como hace
+SimpleRCONClient. La escritura usa un socketpair local; la lectura inyecta los
+paquetes directamente en un StreamReader.
+
+Uso:
+    python -m benchmarks.bench_rcon_codec [--packets N]
+"""
+
+import argparse
+import asyncio
+import socket
+import struct
+import time
+
+from servercontrol.discord.rcon_client import RCONFrameReader, RCONPacketEncoder
+
+PAYLOAD = "There are 3 of a max of 20 players online: Steve, Alex, Notch"
+
+
+# --- Implementación anterior, copiada tal cual como referencia ---
+
+
+def legacy_create_packet(req_id: int, req_type: int, payload: str) -> bytes:
+    payload_bytes = payload.encode("ascii")
+    packet_data = struct.pack("<ii", req_id, req_type) + payload_bytes + b"\x00\x00"
+    packet_len = len(packet_data)
+    return struct.pack("<i", packet_len) + packet_data
+
+
+async def legacy_read_response(reader: asyncio.StreamReader, timeout: float):
+    len_data = await asyncio.wait_for(reader.readexactly(4), timeout)
+    packet_len = struct.unpack("<i", len_data)[0]
+    packet_data = await asyncio.wait_for(reader.readexactly(packet_len), timeout)
+    req_id, res_type = struct.unpack("<ii", packet_data[:8])
+    payload = packet_data[8:-2]
+    return req_id, res_type, payload
+
+
+# --- Escenarios ---
+
+
+def bench_encode_legacy(packets: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, packets, 2):
+        legacy_create_packet(i, 2, PAYLOAD)
+        legacy_create_packet(i + 1, 0, "")
+    return time.perf_counter() - start
+
+
+def bench_encode_codec(packets: int) -> float:
+    encoder = RCONPacketEncoder()
+    start = time.perf_counter()
+    for i in range(0, packets, 2):
+        encoder.add(i, 2, PAYLOAD.encode("utf-8"))
+        encoder.add(i + 1, 0, b"")
+        encoder.flush()
+    return time.perf_counter() - start
+
+
+async def _discard(reader: asyncio.StreamReader):
+    while await reader.read(65536):
+        pass
+
+
+async def bench_send(packets: int, codec: bool) -> float:
+    left, right = socket.socketpair()
+    _, writer = await asyncio.open_connection(sock=left)
+    sink, sink_writer = await asyncio.open_connection(sock=right)
+    consumer = asyncio.create_task(_discard(sink))
+    encoder = RCONPacketEncoder()
+
+    start = time.perf_counter()
+    for i in range(0, packets, 2):
+        if codec:
+            encoder.add(i, 2, PAYLOAD.encode("utf-8"))
+            encoder.add(i + 1, 0, b"")
+            writer.write(encoder.flush())
+        else:
+            writer.write(legacy_create_packet(i, 2, PAYLOAD))
+            writer.write(legacy_create_packet(i + 1, 0, ""))
+        await writer.drain()
+    elapsed = time.perf_counter() - start
+
+    writer.close()
+    await consumer
+    sink_writer.close()
+    return elapsed
+
+
+def _stream_with(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader(limit=len(data) + 1)
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+async def bench_decode_legacy(packets: int, data: bytes) -> float:
+    reader = _stream_with(data)
+    start = time.perf_counter()
+    for _ in range(packets):
+        await legacy_read_response(reader, 5)
+    return time.perf_counter() - start
+
+
+async def bench_decode_codec(packets: int, data: bytes) -> float:
+    frames = RCONFrameReader(_stream_with(data))
+    start = time.perf_counter()
+    for _ in range(packets):
+        await asyncio.wait_for(frames.read_frame(), 5)
+    return time.perf_counter() - start
+
+
+def report(name: str, packets: int, before: float, after: float):
+    print(
+        f"{name:<8} antes: {packets / before:>12,.0f} paquetes/s | "
+        f"después: {packets / after:>12,.0f} paquetes/s | "
+        f"x{before / after:.2f}"
+    )
+
+
+async def main(packets: int):
+    data = b"".join(legacy_create_packet(i, 0, PAYLOAD) for i in range(packets))
+
+    report("encode", packets, bench_encode_legacy(packets), bench_encode_codec(packets))
+    report(
+        "send",
+        packets,
+        await bench_send(packets, codec=False),
+        await bench_send(packets, codec=True),
+    )
+    report(
+        "decode",
+        packets,
+        await bench_decode_legacy(packets, data),
+        await bench_decode_codec(packets, data),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packets", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.packets))
@@ -0,0 +1,209 @@
+"""
+Servidor RCON falso de Minecraft, en asyncio, para pruebas y benchmarks locales.
+
+Habla el mismo protocolo que `servercontrol.discord.rcon_client`: autenticación
+(tipo 3), comandos (tipo 2), respuestas partidas en fragmentos de 4096 bytes y
+la respuesta "Unknown request" a tipos desconocidos que el cliente usa como
+centinela. Permite simular fallos de autenticación, latencia y caídas de conexión.
+
+Uso:
+    python -m benchmarks.fake_rcon_server --port 25575 --password secreto --latency 0.01
+"""
+
+import argparse
+import asyncio
+import random
+import struct
+from typing import Callable, Optional, Union
+
+# Tamaño máximo del payload por paquete que envía el servidor de Minecraft.
+MAX_FRAGMENT_SIZE = 4096
+
+PLAYERS = ["Steve", "Alex", "Notch", "Jeb_", "Dinnerbone", "Müller", "Ñandú"]
+
+CommandHandler = Union[str, Callable[[str], str]]
+
+
+def _list_players(args: str) -> str:
+    return f"There are {len(PLAYERS)} of a max of 20 players online: " + ", ".join(
+        PLAYERS
+    )
+
+
+def _help(args: str) -> str:
+    # Salida suficientemente larga como para llegar en varios fragmentos.
+    return "\n".join(f"§e/comando_{i} §7<argumento> [opcional]" for i in range(400))
+
+
+DEFAULT_COMMANDS: dict[str, CommandHandler] = {
+    "list": _list_players,
+    "help": _help,
+    "echo": lambda args: args,
+    "save-off": "Automatic saving is now disabled",
+    "save-on": "Automatic saving is now enabled",
+    "save-all": "Saved the game",
+}
+
+
+class FakeRCONServer:
+    """
+    Servidor RCON de pruebas.
+
+    - `fail_auth`: rechaza cualquier contraseña.
+    - `latency` / `jitter`: segundos de espera antes de responder a cada
+      autenticación o comando (el centinela se responde al instante).
+    - `fragment_size`: tamaño máximo del payload por paquete de respuesta.
+    - `drop_after`: cierra la conexión tras ese número de comandos.
+    - `drop_probability`: probabilidad de cerrar la conexión en cada comando.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        password: str = "password",
+        fail_auth: bool = False,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        fragment_size: int = MAX_FRAGMENT_SIZE,
+        drop_after: Optional[int] = None,
+        drop_probability: float = 0.0,
+        commands: Optional[dict[str, CommandHandler]] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.fail_auth = fail_auth
+        self.latency = latency
+        self.jitter = jitter
+        self.fragment_size = fragment_size
+        self.drop_after = drop_after
+        self.drop_probability = drop_probability
+        self.commands = dict(DEFAULT_COMMANDS if commands is None else commands)
+        self.connections = 0
+        self.commands_executed = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self):
+        """Empieza a aceptar conexiones. Con `port=0` se elige un puerto libre."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Deja de aceptar conexiones y corta las que siguen abiertas."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def serve_forever(self):
+        await self.start()
+        await self._server.serve_forever()  # type: ignore
+
+    def run_command(self, command: str) -> str:
+        """Devuelve la salida de un comando como lo haría la consola."""
+        name, _, args = command.strip().lstrip("/").partition(" ")
+        handler = self.commands.get(name)
+        if handler is None:
+            return f"Unknown or incomplete command, see below for error{name}<--[HERE]"
+        return handler(args) if callable(handler) else handler
+
+    def _encode(self, req_id: int, res_type: int, payload: bytes) -> bytes:
+        body = struct.pack("<ii", req_id, res_type) + payload + b"\x00\x00"
+        return struct.pack("<i", len(body)) + body
+
+    def _encode_response(self, req_id: int, text: str) -> bytes:
+        payload = text.encode("utf-8")
+        if not payload:
+            return self._encode(req_id, 0, b"")
+        return b"".join(
+            self._encode(req_id, 0, payload[i : i + self.fragment_size])
+            for i in range(0, len(payload), self.fragment_size)
+        )
+
+    async def _delay(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._connections[task] = writer  # type: ignore
+        authenticated = False
+        executed = 0
+        try:
+            while True:
+                (length,) = struct.unpack("<i", await reader.readexactly(4))
+                packet = await reader.readexactly(length)
+                req_id, req_type = struct.unpack_from("<ii", packet)
+                payload = packet[8:-2].decode("utf-8", errors="replace")
+
+                if req_type in (2, 3):
+                    await self._delay()
+                if req_type == 3:
+                    authenticated = not self.fail_auth and payload == self.password
+                    writer.write(self._encode(req_id if authenticated else -1, 2, b""))
+                elif not authenticated:
+                    writer.write(self._encode(-1, 2, b""))
+                elif req_type == 2:
+                    executed += 1
+                    self.commands_executed += 1
+                    if (self.drop_after is not None and executed > self.drop_after) or (
+                        random.random() < self.drop_probability
+                    ):
+                        break
+                    writer.write(
+                        self._encode_response(req_id, self.run_command(payload))
+                    )
+                else:
+                    text = f"Unknown request {req_type:x}"
+                    writer.write(self._encode(req_id, 0, text.encode()))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.pop(task, None)  # type: ignore
+            writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25575)
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--fail-auth", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fragment-size", type=int, default=MAX_FRAGMENT_SIZE)
+    parser.add_argument("--drop-after", type=int, default=None)
+    parser.add_argument("--drop-probability", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeRCONServer(
+        host=args.host,
+        port=args.port,
+        password=args.password,
+        fail_auth=args.fail_auth,
+        latency=args.latency,
+        jitter=args.jitter,
+        fragment_size=args.fragment_size,
+        drop_after=args.drop_after,
+        drop_probability=args.drop_probability,
+    )
+    print(f"Servidor RCON falso escuchando en {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
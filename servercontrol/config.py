@@ -3,7 +3,7 @@ from typing import Literal, Union
 
 from discord import Optional
 from labcontrol.config import Config as LabConfig
-from pydantic import Field, ValidationError
+from pydantic import Field
 from pydantic_settings import BaseSettings
 
 from .telegram.settings import TelegramConfig
@@ -52,6 +52,17 @@ class DiscordConfig(BaseSettings):
     guild_id: Optional[int] = Field(
         None, description="ID del servidor de Discord para pruebas (opcional)"
     )
+    force_command_sync: bool = Field(
+        False,
+        description="Sincronizar los comandos al conectar aunque no hayan cambiado",
+    )
+    status_channel_id: Optional[int] = Field(
+        None, description="Canal donde publicar y mantener el tablero de estado"
+    )
+    metrics_port: Optional[int] = Field(
+        None,
+        description="Puerto local (127.0.0.1) para exponer métricas de Prometheus",
+    )
 
     class Config:
         env_file = ".env"
@@ -90,6 +101,55 @@ class MinecraftConfig(BaseSettings):
         "minecraft", description="Nombre de la sesión de tmux para el servidor"
     )
 
+    status_cache_ttl: float = Field(
+        5.0, description="Segundos durante los que se reutiliza el último estado"
+    )
+
+    # variables para la consulta de estado sin RCON
+    status_probe: Literal["ping", "query", "rcon"] = Field(
+        "ping",
+        description="Método para saber si el servidor está online: Server List Ping, Query (UDP) o RCON",
+    )
+    server_host: Optional[str] = Field(
+        None, description="IP o dominio del puerto de juego (por defecto, rcon_host)"
+    )
+    server_port: int = Field(25565, description="Puerto de juego del servidor")
+    query_port: Optional[int] = Field(
+        None, description="Puerto Query UDP (por defecto, server_port)"
+    )
+
+    # variables para las copias de seguridad
+    world_name: str = Field(
+        "world", description="Nombre del directorio del mundo dentro de server_path"
+    )
+    backup_path: Optional[str] = Field(
+        None, description="Directorio de las copias (por defecto, server_path/backups)"
+    )
+
+    class Config:
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        extra = "ignore"
+        env_prefix = "MINECRAFT_"
+
+
+class MinecraftServersConfig(BaseSettings):
+    """Lista de servidores de Minecraft gestionados, por nombre."""
+
+    servers: Optional[str] = Field(
+        None,
+        description=(
+            "Nombres de los servidores separados por comas (ej. 'survival,creative'). "
+            "La configuración de cada uno usa el prefijo MINECRAFT_<NOMBRE>_"
+        ),
+    )
+
+    @property
+    def names(self) -> list[str]:
+        if not self.servers:
+            return []
+        return [name.strip() for name in self.servers.split(",") if name.strip()]
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -107,6 +167,7 @@ class ManagerConfig:
         discord_config: DiscordConfig,
         orchestrator_config: OrchestratorConfig,
         minecraft_config: MinecraftConfig,
+        minecraft_servers: Optional[dict[str, MinecraftConfig]] = None,
     ) -> None:
         self.orchestrator_config = orchestrator_config
         self.tg_config = tg_config
@@ -114,7 +175,51 @@ class ManagerConfig:
         self.aws_config = aws_config
         self.duckdns_config = duckdns_config
         self.discord_config = discord_config
+        # Servidor por defecto (el primero) y todos los servidores por nombre.
         self.minecraft_config = minecraft_config
+        self.minecraft_servers = minecraft_servers or {"default": minecraft_config}
+
+
+def load_minecraft_servers(env_file: Path) -> dict[str, MinecraftConfig]:
+    """
+    Carga la configuración de cada servidor de MINECRAFT_SERVERS, leyendo las
+    variables con el prefijo MINECRAFT_<NOMBRE>_. Sin MINECRAFT_SERVERS se usa un
+    único servidor, "default", con el prefijo MINECRAFT_.
+
+    Con varios servidores, la sesión de tmux por defecto es el nombre del
+    servidor, y dos servidores no pueden compartir sesión de tmux, directorio,
+    puerto de juego ni puerto RCON: los comandos de uno actuarían sobre el otro.
+    """
+    names = MinecraftServersConfig(_env_file=env_file).names  # type: ignore
+    if not names:
+        return {"default": MinecraftConfig(_env_file=env_file)}  # type: ignore
+
+    servers = {}
+    for name in names:
+        config = MinecraftConfig(
+            _env_file=env_file, _env_prefix=f"MINECRAFT_{name.upper()}_"
+        )  # type: ignore
+        if "terminal_session_name" not in config.model_fields_set:
+            config = config.model_copy(update={"terminal_session_name": name})
+        servers[name] = config
+
+    checks = {
+        "sesión de tmux": lambda c: c.terminal_session_name,
+        "directorio": lambda c: str(Path(c.server_path).resolve()),
+        "puerto de juego": lambda c: f"{c.server_host or c.rcon_host}:{c.server_port}",
+        "puerto RCON": lambda c: f"{c.rcon_host}:{c.rcon_port}",
+    }
+    for label, key in checks.items():
+        seen: dict[str, str] = {}
+        for name, config in servers.items():
+            value = key(config)
+            if value in seen:
+                raise ValueError(
+                    f"Los servidores '{seen[value]}' y '{name}' comparten {label} "
+                    f"({value}). Configura MINECRAFT_{name.upper()}_* con valores propios."
+                )
+            seen[value] = name
+    return servers
 
 
 def load_config_orchestator(env_path: Union[Path, str] = ".env") -> ManagerConfig:
@@ -134,7 +239,8 @@ def load_config_orchestator(env_path: Union[Path, str] = ".env") -> ManagerConfi
         )  # type: ignore
         discord_config = DiscordConfig(_env_file=env_file)  # type: ignore
         orchestrator_config = OrchestratorConfig(_env_file=env_file)  # type: ignore
-        minecraft_config = MinecraftConfig(_env_file=env_file)  # type: ignore
+        minecraft_servers = load_minecraft_servers(env_file)
+        minecraft_config = next(iter(minecraft_servers.values()))
         return ManagerConfig(
             tg_config=tg_config,
             lab_config=lab_config,
@@ -143,7 +249,8 @@ def load_config_orchestator(env_path: Union[Path, str] = ".env") -> ManagerConfi
             discord_config=discord_config,
             orchestrator_config=orchestrator_config,
             minecraft_config=minecraft_config,
+            minecraft_servers=minecraft_servers,
         )
-    except ValidationError as e:
+    except ValueError as e:  # incluye ValidationError
         print(f"Error en la configuración del archivo {env_file}:\n{e}")
         raise
@@ -0,0 +1,248 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from .rcon_client import RCONPool
+
+MANIFEST_NAME = "manifest.json"
+# Ficheros del mundo que no tiene sentido copiar.
+IGNORED_FILES = {"session.lock"}
+# Los .mca ya guardan cada chunk comprimido con zlib: un nivel bajo es suficiente.
+COMPRESS_LEVEL = 3
+# `save-all flush` escribe todo el mundo a disco: puede tardar mucho más que el
+# timeout normal de RCON en mundos grandes.
+SAVE_FLUSH_TIMEOUT = 120.0
+
+
+@dataclass
+class BackupResult:
+    """Resumen de una copia de seguridad."""
+
+    path: Path
+    files: int
+    files_written: int
+    bytes_scanned: int
+    bytes_written: int
+    wall_time: float
+
+
+def _store_file(
+    source: str, destination: str, previous_hash: Optional[str]
+) -> tuple[str, int, int]:
+    """
+    Lee un fichero, calcula su hash y, si cambió, lo guarda comprimido en
+    `destination`. Se ejecuta en un hilo del pool: blake2b y zlib liberan el GIL
+    con bloques grandes, así que varios ficheros se procesan en paralelo. Devuelve (hash, bytes leídos,
+    bytes escritos); 0 bytes escritos significa que el contenido no cambió.
+    """
+    data = Path(source).read_bytes()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == previous_hash:
+        return digest, len(data), 0
+
+    compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    with open(destination, "wb") as f:
+        f.write(compressed)
+    return digest, len(data), len(compressed)
+
+
+def _link_or_copy(source: Path, destination: Path):
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        # Otro sistema de ficheros o sin soporte de enlaces duros.
+        shutil.copy2(source, destination)
+
+
+class WorldBackup:
+    """
+    Copias incrementales y deduplicadas del mundo de un servidor.
+
+    Cada copia es un directorio `AAAAmmdd-HHMMSS` dentro de `backup_root` con los
+    ficheros del mundo comprimidos (`<ruta>.gz`) y un `manifest.json` con el hash
+    de cada uno. Los ficheros cuyo contenido no cambió respecto a la copia anterior
+    se enlazan (hardlink) en lugar de copiarse, y si además conservan tamaño y
+    fecha de modificación ni siquiera se leen. El resto se comprime en paralelo
+    en un pool de hilos. Si ya existe una copia con el mismo nombre (dos copias en
+    el mismo segundo), se añade un sufijo `-N`.
+
+    Para restaurar basta con descomprimir cada `.gz` en su ruta original.
+    """
+
+    def __init__(
+        self,
+        world_path: Union[Path, str],
+        backup_root: Union[Path, str],
+        workers: Optional[int] = None,
+    ):
+        self.world_path = Path(world_path)
+        self.backup_root = Path(backup_root)
+        self.workers = workers or os.cpu_count() or 1
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _previous_snapshot(self) -> tuple[Optional[Path], dict[str, dict]]:
+        """Devuelve la copia completa más reciente y su manifiesto."""
+        if not self.backup_root.is_dir():
+            return None, {}
+        for path in sorted(self.backup_root.iterdir(), reverse=True):
+            if path.name.startswith("."):
+                continue  # copia a medias
+            try:
+                manifest = json.loads((path / MANIFEST_NAME).read_text("utf-8"))
+            except (OSError, ValueError):
+                continue
+            return path, manifest["files"]
+        return None, {}
+
+    def _scan_world(self) -> dict[str, os.stat_result]:
+        files = {}
+        for root, _, names in os.walk(self.world_path):
+            for name in names:
+                if name in IGNORED_FILES:
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.world_path)
+                files[relative.replace(os.sep, "/")] = os.stat(path)
+        return files
+
+    async def create(self, rcon: Optional[RCONPool] = None) -> BackupResult:
+        """
+        Crea una copia nueva. Con `rcon`, el servidor está en marcha: se desactiva
+        el guardado automático y se fuerza un guardado completo antes de copiar, y
+        se vuelve a activar al terminar aunque la copia falle.
+        """
+        if not self.world_path.is_dir():
+            raise FileNotFoundError(f"No existe el mundo en {self.world_path}")
+
+        async with self._lock:
+            start = time.perf_counter()
+            try:
+                # save-off va dentro del try: si algo falla a partir de aquí (p. ej.
+                # un timeout del flush), save-on se envía igualmente.
+                if rcon is not None:
+                    await rcon.execute("save-off")
+                    await rcon.execute("save-all flush", timeout=SAVE_FLUSH_TIMEOUT)
+                result = await self._snapshot()
+            finally:
+                if rcon is not None:
+                    await rcon.execute("save-on")
+            result.wall_time = time.perf_counter() - start
+            return result
+
+    def _unique_name(self, base: str) -> str:
+        """`base`, o `base-N` si ya hay una copia (o una a medias) con ese nombre."""
+        name, n = base, 0
+        while (self.backup_root / name).exists() or (
+            self.backup_root / f".{name}.partial"
+        ).exists():
+            n += 1
+            name = f"{base}-{n}"
+        return name
+
+    async def _snapshot(self) -> BackupResult:
+        previous_path, previous = await asyncio.to_thread(self._previous_snapshot)
+        files = await asyncio.to_thread(self._scan_world)
+
+        name = await asyncio.to_thread(
+            self._unique_name, time.strftime("%Y%m%d-%H%M%S")
+        )
+        partial = self.backup_root / f".{name}.partial"
+        await asyncio.to_thread(partial.mkdir, parents=True)
+        try:
+            return await self._fill_snapshot(
+                partial, name, files, previous_path, previous
+            )
+        except BaseException:
+            await asyncio.to_thread(shutil.rmtree, partial, True)
+            raise
+
+    async def _fill_snapshot(
+        self,
+        partial: Path,
+        name: str,
+        files: dict[str, os.stat_result],
+        previous_path: Optional[Path],
+        previous: dict[str, dict],
+    ) -> BackupResult:
+        loop = asyncio.get_running_loop()
+
+        manifest: dict[str, dict] = {}
+        unchanged: list[str] = []
+        to_store: list[str] = []
+        for relative, stat in files.items():
+            known = previous.get(relative)
+            if (
+                known is not None
+                and known["size"] == stat.st_size
+                and known["mtime_ns"] == stat.st_mtime_ns
+            ):
+                unchanged.append(relative)
+                manifest[relative] = known
+            else:
+                to_store.append(relative)
+
+        bytes_scanned = bytes_written = 0
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="world-backup"
+        ) as executor:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        _store_file,
+                        str(self.world_path / relative),
+                        str(partial / f"{relative}.gz"),
+                        previous.get(relative, {}).get("hash"),
+                    )
+                    for relative in to_store
+                )
+            )
+
+        for relative, (digest, scanned, written) in zip(to_store, results):
+            bytes_scanned += scanned
+            bytes_written += written
+            stat = files[relative]
+            manifest[relative] = {
+                "hash": digest,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            if not written:
+                unchanged.append(relative)
+
+        def finish() -> Path:
+            if previous_path is not None:
+                for relative in unchanged:
+                    _link_or_copy(
+                        previous_path / f"{relative}.gz", partial / f"{relative}.gz"
+                    )
+            (partial / MANIFEST_NAME).write_text(
+                json.dumps({"created": name, "files": manifest}), "utf-8"
+            )
+            final = self.backup_root / name
+            partial.rename(final)
+            return final
+
+        path = await asyncio.to_thread(finish)
+        return BackupResult(
+            path=path,
+            files=len(files),
+            files_written=len(files) - len(unchanged),
+            bytes_scanned=bytes_scanned,
+            bytes_written=bytes_written,
+            wall_time=0.0,
+        )
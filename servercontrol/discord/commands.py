@@ -1,33 +1,215 @@
-import subprocess
+import asyncio
+import io
+import logging
+import re
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Sequence, cast
+from typing import Optional, Sequence, cast
 
 import discord
 
 from servercontrol.config import MinecraftConfig
 from servercontrol.discord.enums import ServerStatus
 
+from .backup import BackupResult, WorldBackup
+from .disk_usage import DiskUsageAnalyzer, DiskUsageReport
 from .guild_config import GuildConfigManager
-from .rcon_client import RCONAuthError, RCONConnectionError, SimpleRCONClient
+from .log_index import LogIndex
+from .log_tail import tail_lines
+from .log_watcher import LogFollower, ServerReadiness, wait_for_server_ready
+from .metrics import metrics
+from .monitor import ServerMonitor
+from .operations import OperationOutcome, ServerOperationCoordinator
+from .pagination import paginate_lines
+from .player_cache import PlayerCache, parse_player_list
+from .rcon_client import (
+    RCONAuthError,
+    RCONConnectionError,
+    RCONPool,
+    strip_color_codes,
+)
+from .rcon_output import RCONOutputCache, RCONOutputView, render_page
+from .status_cache import StatusCache
+from .status_probe import ServerPing, StatusProbeError, ping_server, query_server
+from .tmux import get_tmux_controller
+
+logger = logging.getLogger(__name__)
+
+# Pools RCON compartidos por todos los comandos, uno por servidor.
+_rcon_pools: dict[tuple[str, int, str], RCONPool] = {}
+# Cachés de estado compartidas, una por servidor.
+_status_caches: dict[tuple[str, int], StatusCache] = {}
+# Último resultado de Server List Ping / Query de cada servidor.
+_last_pings: dict[tuple[str, int], ServerPing] = {}
+# Índices de logs rotados, uno por directorio de servidor.
+_log_indexes: dict[str, LogIndex] = {}
+# Copias de seguridad del mundo, una por servidor.
+_world_backups: dict[str, WorldBackup] = {}
+# Analizadores de uso de disco, uno por directorio de servidor.
+_disk_analyzers: dict[str, DiskUsageAnalyzer] = {}
+# Operaciones de arranque/parada: serializadas por servidor y compartidas.
+_operations = ServerOperationCoordinator()
+# Jugadores conectados y recientes, uno por directorio de servidor.
+_player_caches: dict[str, PlayerCache] = {}
+# Salidas recientes de `/rcon`, para paginarlas sin repetir el comando.
+_rcon_outputs = RCONOutputCache()
+# Referencias a las tareas en segundo plano para que no las recoja el GC.
+_background_tasks: set[asyncio.Task] = set()
+
+# Segundos que se espera a cada servidor en `/server_status all`.
+STATUS_ALL_TIMEOUT = 5.0
+# Salidas de `/rcon` con más páginas que esto se envían como fichero adjunto.
+RCON_MAX_PAGES = 20
 
 # --- Utilidades ---
 
 
-def exists_tmux_session(session_name: str) -> bool:
+def get_rcon_pool(config: MinecraftConfig) -> RCONPool:
+    """Devuelve el pool RCON compartido para el servidor indicado en la configuración."""
+    key = (config.rcon_host, config.rcon_port, config.rcon_password)
+    pool = _rcon_pools.get(key)
+    if pool is None:
+        pool = RCONPool(config.rcon_host, config.rcon_port, config.rcon_password)
+        _rcon_pools[key] = pool
+    return pool
+
+
+async def exists_tmux_session(session_name: str) -> bool:
     """Comprueba si una sesión de tmux con el nombre dado existe. Devuelve True si existe, False si no."""
-    check_process = subprocess.run(["tmux", "has-session", "-t", session_name])
-    return check_process.returncode == 0
+    return await get_tmux_controller().has_session(session_name)
+
+
+def get_log_index(config: MinecraftConfig) -> LogIndex:
+    """Devuelve el índice de logs rotados del servidor de la configuración."""
+    index = _log_indexes.get(config.server_path)
+    if index is None:
+        index = LogIndex(Path(config.server_path) / "logs")
+        _log_indexes[config.server_path] = index
+    return index
+
+
+def get_world_backup(config: MinecraftConfig) -> WorldBackup:
+    """Devuelve el gestor de copias de seguridad del mundo del servidor."""
+    backup = _world_backups.get(config.server_path)
+    if backup is None:
+        server_path = Path(config.server_path)
+        backup = WorldBackup(
+            server_path / config.world_name,
+            config.backup_path or server_path / "backups",
+        )
+        _world_backups[config.server_path] = backup
+    return backup
+
+
+def get_disk_analyzer(config: MinecraftConfig) -> DiskUsageAnalyzer:
+    """Devuelve el analizador de uso de disco del directorio del servidor."""
+    analyzer = _disk_analyzers.get(config.server_path)
+    if analyzer is None:
+        analyzer = DiskUsageAnalyzer(config.server_path)
+        _disk_analyzers[config.server_path] = analyzer
+    return analyzer
+
+
+def get_player_cache(config: MinecraftConfig) -> PlayerCache:
+    """Devuelve la caché de jugadores del servidor de la configuración."""
+    cache = _player_caches.get(config.server_path)
+    if cache is None:
+        cache = PlayerCache()
+        _player_caches[config.server_path] = cache
+    return cache
+
+
+def format_bytes(size: float) -> str:
+    """Formatea un tamaño en bytes con la unidad más adecuada."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def format_growth(growth: Optional[int]) -> str:
+    """Formatea el crecimiento respecto al análisis anterior, p. ej. ` (+1.5 MiB)`."""
+    if not growth:
+        return ""
+    sign = "+" if growth > 0 else "-"
+    return f" ({sign}{format_bytes(abs(growth))})"
+
+
+def describe_backup(result: BackupResult) -> str:
+    return (
+        f"Copia de seguridad creada en `{result.path}`:\n"
+        f"- Ficheros: {result.files} ({result.files_written} nuevos o modificados)\n"
+        f"- Leído: {format_bytes(result.bytes_scanned)}\n"
+        f"- Escrito: {format_bytes(result.bytes_written)}\n"
+        f"- Tiempo: {result.wall_time:.1f} s"
+    )
+
+
+def get_status_cache(config: MinecraftConfig) -> StatusCache:
+    """Devuelve la caché de estado compartida para el servidor de la configuración."""
+    key = (config.rcon_host, config.rcon_port)
+    cache = _status_caches.get(key)
+    if cache is None:
+        cache = StatusCache(
+            lambda: probe_minecraft_server_status(config), config.status_cache_ttl
+        )
+        _status_caches[key] = cache
+    return cache
+
+
+async def get_minecraft_server_status(
+    config: MinecraftConfig, force: bool = False
+) -> ServerStatus:
+    """
+    Devuelve el estado del servidor, reutilizando el último sondeo durante
+    `status_cache_ttl` segundos. Las llamadas concurrentes comparten un único
+    sondeo. Con `force=True` se ignora la caché.
+    """
+    return await get_status_cache(config).get(force=force)
+
+
+def get_last_ping(config: MinecraftConfig) -> Optional[ServerPing]:
+    """Devuelve el último MOTD, versión y jugadores conocidos del servidor."""
+    return _last_pings.get((config.rcon_host, config.rcon_port))
 
 
-async def get_minecraft_server_status(config: MinecraftConfig) -> ServerStatus:
+async def probe_minecraft_server_status(config: MinecraftConfig) -> ServerStatus:
     """
-    Verifica el estado real del servidor.
+    Verifica el estado real del servidor con el método de `config.status_probe`.
     """
+    if config.status_probe == "rcon":
+        return await _probe_with_rcon(config)
+
+    key = (config.rcon_host, config.rcon_port)
+    host = config.server_host or config.rcon_host
+    try:
+        if config.status_probe == "query":
+            ping = await query_server(host, config.query_port or config.server_port)
+        else:
+            ping = await ping_server(host, config.server_port)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        _last_pings.pop(key, None)
+        get_player_cache(config).set_online([])
+        return ServerStatus.OFFLINE
+    except StatusProbeError:
+        return ServerStatus.UNKNOWN
+
+    _last_pings[key] = ping
+    # La muestra de jugadores del ping puede estar recortada: solo es la lista
+    # completa si contiene a todos los conectados.
+    if len(ping.player_sample) >= ping.players_online:
+        get_player_cache(config).set_online(ping.player_sample)
+    else:
+        get_player_cache(config).mark_seen(ping.player_sample)
+    return ServerStatus.ONLINE
+
+
+async def _probe_with_rcon(config: MinecraftConfig) -> ServerStatus:
+    """Verifica el estado abriendo (o reutilizando) una sesión RCON."""
     try:
-        async with SimpleRCONClient(
-            config.rcon_host, config.rcon_port, config.rcon_password
-        ) as client:
-            await client.execute("list")
+        await get_rcon_pool(config).execute("list")
         return ServerStatus.ONLINE
     except (RCONConnectionError, RCONAuthError) as e:
         return ServerStatus.OFFLINE
@@ -35,6 +217,57 @@ async def get_minecraft_server_status(config: MinecraftConfig) -> ServerStatus:
         return ServerStatus.UNKNOWN
 
 
+async def feed_players_from_logs(config: MinecraftConfig):
+    """
+    Añade a la caché los jugadores del índice de logs rotados, con la fecha del
+    log más reciente en que aparecen.
+    """
+    index = get_log_index(config)
+    await index.update()
+    cache = get_player_cache(config)
+    for player, files in list(index.players.items()):
+        if files:
+            newest = max(files)[:10]
+            cache.add(player, datetime.strptime(newest, "%Y-%m-%d").timestamp())
+
+
+async def sample_players(
+    config: MinecraftConfig,
+    monitor: ServerMonitor,
+    interval: float = 60.0,
+    log_interval: float = 3600.0,
+):
+    """
+    Mantiene al día la caché de jugadores: cada `interval` segundos pide la lista
+    completa por RCON si el servidor está online, y cada `log_interval` segundos
+    incorpora los jugadores de los logs rotados.
+    """
+    next_log_scan = 0.0
+    while True:
+        try:
+            if time.monotonic() >= next_log_scan:
+                next_log_scan = time.monotonic() + log_interval
+                if (Path(config.server_path) / "logs").is_dir():
+                    await feed_players_from_logs(config)
+            if monitor.status == ServerStatus.ONLINE:
+                response = await get_rcon_pool(config).execute("list")
+                get_player_cache(config).set_online(
+                    parse_player_list(strip_color_codes(response))
+                )
+        except (RCONConnectionError, RCONAuthError):
+            pass  # El servidor aún no acepta RCON; el monitor ya lo refleja.
+        except Exception:
+            logger.exception("Error al actualizar la caché de jugadores")
+        await asyncio.sleep(interval)
+
+
+def start_player_sampler(config: MinecraftConfig, monitor: ServerMonitor):
+    """Arranca en segundo plano `sample_players` para el servidor."""
+    task = asyncio.get_running_loop().create_task(sample_players(config, monitor))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
 # --- Comandos ---
 
 
@@ -51,92 +284,181 @@ async def echo(interaction: discord.Interaction, text: str):
 
 
 async def start_minecraft_server(
-    interaction: discord.Interaction, config: MinecraftConfig
+    interaction: discord.Interaction, config: MinecraftConfig, monitor: ServerMonitor
 ):
     """
     Inicia el servidor de Minecraft en una sesión 'tmux' si no está ya corriendo.
+    Si ya hay un arranque en curso, espera a ese y responde con su resultado.
     """
     await interaction.response.defer(ephemeral=True)
+    outcome, joined = await _operations.run(
+        config.server_path, "start", lambda: _start_server(config, monitor)
+    )
+    await send_operation_outcome(interaction, outcome, joined)
+
 
+async def _start_server(
+    config: MinecraftConfig, monitor: ServerMonitor
+) -> OperationOutcome:
     session_name = config.terminal_session_name
-    if exists_tmux_session(session_name):
-        await interaction.followup.send(
-            f"El servidor de Minecraft ya está en ejecución en la sesión de tmux `{session_name}`."
+    if await exists_tmux_session(session_name):
+        return OperationOutcome(
+            [
+                f"El servidor de Minecraft ya está en ejecución en la sesión de tmux `{session_name}`."
+            ]
         )
-        return
 
     # 2. Si no existe, iniciarlo
     server_path = Path(config.server_path)
     start_script = server_path / "start.sh"
 
     if not start_script.exists():
-        await interaction.followup.send(
-            f"**Error:** No se encontró el script `start.sh` en la ruta `{server_path}`."
+        return OperationOutcome(
+            [
+                f"**Error:** No se encontró el script `start.sh` en la ruta `{server_path}`."
+            ]
         )
-        return
 
-    current_status = await get_minecraft_server_status(config)
+    current_status = await get_minecraft_server_status(config, force=True)
     if current_status == ServerStatus.ONLINE:
-        await interaction.followup.send(
-            "El servidor ya está online. No se necesita ninguna acción."
+        return OperationOutcome(
+            ["El servidor ya está online. No se necesita ninguna acción."]
         )
-        return
 
     try:
-        subprocess.Popen(
-            ["tmux", "new-session", "-s", session_name, "-d", str(start_script)]
-        )
-        await interaction.followup.send(
-            f"¡Iniciando el servidor de Minecraft en la sesión de tmux `{session_name}`! Dale uno o dos minutos para que arranque."
+        # Se toma la posición del log antes de lanzar el servidor para no perder
+        # ninguna línea del arranque.
+        follower = LogFollower(server_path / "logs" / "latest.log")
+        await get_tmux_controller().new_session(session_name, str(start_script))
+        get_status_cache(config).invalidate()
+        monitor.notify_starting()
+        # El token de la interacción caduca a los 15 minutos.
+        readiness = asyncio.create_task(wait_for_server_ready(follower, timeout=600))
+        _background_tasks.add(readiness)
+        readiness.add_done_callback(_background_tasks.discard)
+        return OperationOutcome(
+            [
+                f"¡Iniciando el servidor de Minecraft en la sesión de tmux `{session_name}`! Te avisaré aquí cuando esté listo."
+            ],
+            readiness=readiness,
         )
 
     except Exception as e:
+        return OperationOutcome(
+            [f"**Error inesperado al iniciar el servidor:**\n```\n{e}\n```"]
+        )
+
+
+async def send_operation_outcome(
+    interaction: discord.Interaction, outcome: OperationOutcome, joined: bool
+):
+    """
+    Envía a una interacción el resultado de una operación de ciclo de vida. Si la
+    operación lanzó el servidor, el último mensaje se actualiza al terminar el arranque.
+    """
+    if joined:
         await interaction.followup.send(
-            f"**Error inesperado al iniciar el servidor:**\n```\n{e}\n```"
+            "Ya había otra petición igual en curso; este es su resultado:"
         )
+    for i, content in enumerate(outcome.messages):
+        if outcome.readiness is not None and i == len(outcome.messages) - 1:
+            message = await interaction.followup.send(content, wait=True)
+            task = asyncio.create_task(
+                report_server_readiness(message, outcome.readiness)
+            )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        else:
+            await interaction.followup.send(content)
+
+
+async def report_server_readiness(
+    message: discord.WebhookMessage, readiness_task: "asyncio.Task[ServerReadiness]"
+):
+    """
+    Espera a que el log indique que el servidor terminó de arrancar (o falló) y
+    actualiza el mensaje de la interacción con el resultado.
+    """
+    readiness = await asyncio.shield(readiness_task)
+
+    if readiness.ready:
+        content = f"✅ **El servidor de Minecraft está listo.** Arrancó en {readiness.boot_time:.1f} s."
+    elif readiness.error:
+        content = (
+            "❌ **El servidor de Minecraft falló al arrancar:**\n"
+            f"```\n{readiness.error[:1800]}\n```"
+        )
+    else:
+        content = "⚠️ No se detectó el final del arranque en 10 minutos. Revisa el log del servidor."
+
+    try:
+        await message.edit(content=content)
+    except discord.HTTPException as e:
+        print(f"No se pudo actualizar el mensaje de arranque: {e}")
 
 
 async def stop_minecraft_server(
-    interaction: discord.Interaction, config: MinecraftConfig
+    interaction: discord.Interaction,
+    config: MinecraftConfig,
+    monitor: ServerMonitor,
+    backup: bool = False,
 ):
     """
     Envía el comando 'stop' a la sesión tmux del servidor de Minecraft.
+    Con `backup`, antes se hace una copia de seguridad del mundo; si falla, el
+    servidor no se detiene. Si ya hay una parada en curso, espera a esa y
+    responde con su resultado.
     """
     await interaction.response.defer(ephemeral=True)
+    outcome, joined = await _operations.run(
+        config.server_path, "stop", lambda: _stop_server(config, monitor, backup)
+    )
+    await send_operation_outcome(interaction, outcome, joined)
+
+
+async def _stop_server(
+    config: MinecraftConfig, monitor: ServerMonitor, backup: bool
+) -> OperationOutcome:
     session_name = config.terminal_session_name
 
-    if exists_tmux_session(session_name) is False:
-        await interaction.followup.send(
-            f"El servidor de Minecraft no está en ejecución. No se encontró la sesión de tmux `{session_name}`."
+    if await exists_tmux_session(session_name) is False:
+        return OperationOutcome(
+            [
+                f"El servidor de Minecraft no está en ejecución. No se encontró la sesión de tmux `{session_name}`."
+            ]
         )
-        return
 
-    current_status = await get_minecraft_server_status(config)
+    current_status = await get_minecraft_server_status(config, force=True)
     if current_status == ServerStatus.OFFLINE:
-        await interaction.followup.send(
-            "El servidor ya está offline. No se necesita ninguna acción."
+        return OperationOutcome(
+            ["El servidor ya está offline. No se necesita ninguna acción."]
         )
-        return
+
+    outcome = OperationOutcome()
+    if backup:
+        try:
+            result = await get_world_backup(config).create(get_rcon_pool(config))
+        except Exception as e:
+            outcome.messages.append(
+                f"**Error en la copia de seguridad; el servidor sigue en marcha:**\n```\n{e}\n```"
+            )
+            return outcome
+        outcome.messages.append(describe_backup(result))
 
     try:
-        subprocess.run(
-            [
-                "tmux",
-                "send-keys",
-                "-t",
-                session_name,
-                "stop",
-                "C-m",  # Enviamos el comando 'stop' y luego la tecla Enter (C-m)
-            ]
-        )
-        await interaction.followup.send(
+        # Enviamos el comando 'stop' y luego la tecla Enter (C-m)
+        await get_tmux_controller().send_keys(session_name, "stop", "C-m")
+        get_status_cache(config).invalidate()
+        monitor.notify_stopping()
+        outcome.messages.append(
             f"Comando de apagado enviado al servidor. La sesión de tmux `{session_name}` se cerrará en breve."
         )
 
     except Exception as e:
-        await interaction.followup.send(
+        outcome.messages.append(
             f"**Error inesperado al intentar detener el servidor:**\n```\n{e}\n```"
         )
+    return outcome
 
 
 async def setup_bot_role(
@@ -172,6 +494,9 @@ async def setup_bot_role(
     roles: Sequence[discord.Role] = getattr(interaction.guild, "roles", [])
     existing_role = discord.utils.get(roles, name=rolename)
     if existing_role:
+        config_manager.set_admin_role(
+            interaction.guild.id, existing_role.name, existing_role.id  # type: ignore
+        )
         await interaction.followup.send(
             f"El rol '{rolename}' ya existe. ¡Todo listo!", ephemeral=True
         )
@@ -183,7 +508,9 @@ async def setup_bot_role(
             name=rolename,
             reason=f"Rol requerido por {bot_member.display_name} para la administración.",
         )
-        config_manager.set_admin_role(interaction.guild.id, rolename)  # type: ignore
+        config_manager.set_admin_role(
+            interaction.guild.id, new_role.name, new_role.id  # type: ignore
+        )
         await interaction.followup.send(
             f"Rol '{new_role.name}' creado con éxito. "
             "Ahora puedes usar los comandos restringidos a este rol.",
@@ -201,15 +528,442 @@ async def setup_bot_role(
 
 
 async def check_server_status(
-    interaction: discord.Interaction, config: MinecraftConfig
+    interaction: discord.Interaction, config: MinecraftConfig, monitor: ServerMonitor
 ):
     """
-    Muestra el estado actual y real del servidor de Minecraft.
+    Muestra el estado actual del servidor de Minecraft según el monitor en segundo
+    plano. Solo se sondea si el monitor aún no conoce el estado.
     """
     await interaction.response.defer(ephemeral=True)
-    status = await get_minecraft_server_status(config)
+    status = monitor.status
+    if status == ServerStatus.UNKNOWN:
+        status = await get_minecraft_server_status(config)
 
     if status == ServerStatus.ONLINE:
-        await interaction.followup.send("**El servidor de Minecraft está Online.**")
+        ping = get_last_ping(config)
+        details = (
+            f"\nJugadores: {ping.players_online}/{ping.players_max}"
+            f" | Versión: {ping.version}\n> {ping.motd}"
+            if ping
+            else ""
+        )
+        await interaction.followup.send(
+            f"**El servidor de Minecraft está Online.**{details}"
+        )
+    elif status == ServerStatus.STARTING:
+        await interaction.followup.send(
+            "**El servidor de Minecraft está arrancando.** Aún no acepta jugadores."
+        )
+    elif status == ServerStatus.STOPPING:
+        await interaction.followup.send(
+            "**El servidor de Minecraft se está apagando.**"
+        )
     else:
         await interaction.followup.send("**El servidor de Minecraft está Offline.**")
+
+
+async def _server_status_line(
+    name: str, config: MinecraftConfig, monitor: ServerMonitor
+) -> str:
+    """
+    Estado de un servidor en una línea. Se sondea (con la caché de estado) salvo
+    que el monitor sepa que está arrancando o apagándose.
+    """
+    status = monitor.status
+    if status not in (ServerStatus.STARTING, ServerStatus.STOPPING):
+        try:
+            status = await asyncio.wait_for(
+                get_minecraft_server_status(config), STATUS_ALL_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            return f"⚪ **{name}**: sin respuesta en {STATUS_ALL_TIMEOUT:.0f} s"
+
+    if status == ServerStatus.ONLINE:
+        ping = get_last_ping(config)
+        details = (
+            f" ({ping.players_online}/{ping.players_max} jugadores, {ping.version})"
+            if ping
+            else ""
+        )
+        return f"🟢 **{name}**: Online{details}"
+    if status == ServerStatus.STARTING:
+        return f"🟠 **{name}**: arrancando"
+    if status == ServerStatus.STOPPING:
+        return f"🟠 **{name}**: apagándose"
+    if status == ServerStatus.OFFLINE:
+        return f"🔴 **{name}**: Offline"
+    return f"⚪ **{name}**: estado desconocido"
+
+
+async def check_all_servers_status(
+    interaction: discord.Interaction,
+    servers: dict[str, MinecraftConfig],
+    monitors: dict[str, ServerMonitor],
+):
+    """
+    Muestra el estado de todos los servidores. Se sondean a la vez, cada uno con
+    su propio límite de tiempo, así que la respuesta tarda lo que el más lento y
+    no la suma de todos.
+    """
+    await interaction.response.defer(ephemeral=True)
+    results = await asyncio.gather(
+        *(
+            _server_status_line(name, config, monitors[name])
+            for name, config in servers.items()
+        ),
+        return_exceptions=True,
+    )
+    lines = [
+        (
+            f"⚪ **{name}**: error al consultar el estado ({result})"
+            if isinstance(result, Exception)
+            else result
+        )
+        for name, result in zip(servers, results)
+    ]
+    await interaction.followup.send("\n".join(lines))
+
+
+async def show_server_logs(
+    interaction: discord.Interaction,
+    config: MinecraftConfig,
+    lines: int = 20,
+    filter: Optional[str] = None,
+    page: int = 1,
+):
+    """
+    Muestra las últimas líneas de `logs/latest.log`, opcionalmente filtradas por
+    una expresión regular. Si no caben en un mensaje se paginan; la página 1 es
+    la más reciente.
+    """
+    await interaction.response.defer(ephemeral=True)
+
+    try:
+        pattern = re.compile(filter, re.IGNORECASE) if filter else None
+    except re.error as e:
+        await interaction.followup.send(
+            f"**Error:** el filtro no es una expresión regular válida: {e}"
+        )
+        return
+
+    log_path = Path(config.server_path) / "logs" / "latest.log"
+    if not log_path.exists():
+        await interaction.followup.send(f"No se encontró el log en `{log_path}`.")
+        return
+
+    found = await asyncio.to_thread(tail_lines, log_path, lines, pattern)
+    if not found:
+        await interaction.followup.send("No hay líneas que mostrar.")
+        return
+
+    pages = paginate_lines(found)
+    page = min(max(page, 1), len(pages))
+    footer = (
+        f"\nPágina {page}/{len(pages)} (1 = más reciente). Usa la opción `page` para ver otras."
+        if len(pages) > 1
+        else ""
+    )
+    await interaction.followup.send(f"```\n{pages[-page]}\n```{footer}")
+
+
+async def search_server_logs(
+    interaction: discord.Interaction,
+    config: MinecraftConfig,
+    player: Optional[str] = None,
+    event: Optional[str] = None,
+    limit: int = 20,
+    page: int = 1,
+):
+    """
+    Busca en `latest.log` y en los logs rotados las apariciones más recientes de
+    un jugador y/o de un tipo de evento. El índice evita descomprimir los ficheros
+    que no pueden contener resultados.
+    """
+    await interaction.response.defer(ephemeral=True)
+
+    if not player and not event:
+        await interaction.followup.send(
+            "**Error:** indica al menos un jugador o un tipo de evento."
+        )
+        return
+
+    logs_dir = Path(config.server_path) / "logs"
+    if not logs_dir.is_dir():
+        await interaction.followup.send(f"No se encontró el directorio `{logs_dir}`.")
+        return
+
+    matches = await get_log_index(config).search(player, event, limit)
+    if not matches:
+        await interaction.followup.send("No se encontraron coincidencias.")
+        return
+
+    found = [f"{m.date} {m.line}" for m in matches]
+    pages = paginate_lines(found)
+    page = min(max(page, 1), len(pages))
+    footer = (
+        f"\nPágina {page}/{len(pages)} (1 = más reciente). Usa la opción `page` para ver otras."
+        if len(pages) > 1
+        else ""
+    )
+    await interaction.followup.send(f"```\n{pages[page - 1]}\n```{footer}")
+
+
+async def backup_minecraft_server(
+    interaction: discord.Interaction, config: MinecraftConfig
+):
+    """
+    Crea una copia de seguridad incremental del mundo. Si el servidor está en
+    marcha, se guarda el mundo por RCON y se pausa el guardado mientras se copia.
+    """
+    await interaction.response.defer(ephemeral=True)
+    world_backup = get_world_backup(config)
+    if world_backup.running:
+        await interaction.followup.send("Ya hay una copia de seguridad en curso.")
+        return
+
+    status = await get_minecraft_server_status(config, force=True)
+    rcon = get_rcon_pool(config) if status == ServerStatus.ONLINE else None
+    if rcon is None and await exists_tmux_session(config.terminal_session_name):
+        await interaction.followup.send(
+            "El servidor está arrancando o deteniéndose; inténtalo cuando termine."
+        )
+        return
+
+    try:
+        result = await world_backup.create(rcon)
+    except (RCONConnectionError, RCONAuthError) as e:
+        await interaction.followup.send(
+            f"**Error de RCON:** no se pudo preparar el mundo para la copia: {e}"
+        )
+        return
+    except asyncio.TimeoutError:
+        await interaction.followup.send(
+            "**Error de RCON:** el servidor no terminó de guardar el mundo a tiempo; "
+            "no se hizo la copia."
+        )
+        return
+    except OSError as e:
+        await interaction.followup.send(
+            f"**Error en la copia de seguridad:**\n```\n{e}\n```"
+        )
+        return
+    await interaction.followup.send(describe_backup(result))
+
+
+def describe_disk_usage(report: DiskUsageReport, top: int = 8) -> list[str]:
+    """Convierte un informe de uso de disco en líneas de texto."""
+
+    def section(title: str, name: str, sizes: dict[str, int]) -> list[str]:
+        lines = [f"\n{title}:"]
+        for key, size in sorted(sizes.items(), key=lambda kv: kv[1], reverse=True)[
+            :top
+        ]:
+            growth = format_growth(report.growth(name, key))
+            lines.append(f"  {format_bytes(size):>10}  {key or '.'}{growth}")
+        return lines
+
+    lines = [
+        f"Total: {format_bytes(report.total)}{format_growth(report.growth('total'))}"
+    ]
+    lines += section("Directorios", "top_level", report.top_level)
+    lines += section("Dimensiones", "dimensions", report.dimensions)
+    lines += section("Regiones más grandes", "regions", report.regions)
+
+    if report.previous:
+        before = report.previous.get("regions", {})
+        growing = sorted(
+            (
+                (size - before.get(key, 0), key)
+                for key, size in report.regions.items()
+                if size > before.get(key, 0)
+            ),
+            reverse=True,
+        )[:top]
+        if growing:
+            lines.append("\nRegiones que más crecieron:")
+            lines += [f"  {'+' + format_bytes(g):>11}  {key}" for g, key in growing]
+
+    lines.append(f"\n{report.dirs_scanned} directorios analizados.")
+    return lines
+
+
+async def show_disk_usage(interaction: discord.Interaction, config: MinecraftConfig):
+    """
+    Muestra cuánto ocupan el servidor, cada dimensión y las regiones más grandes,
+    y cuánto han crecido desde el análisis anterior.
+    """
+    await interaction.response.defer(ephemeral=True)
+
+    if not Path(config.server_path).is_dir():
+        await interaction.followup.send(
+            f"No se encontró el directorio `{config.server_path}`."
+        )
+        return
+
+    report = await get_disk_analyzer(config).analyze()
+    previous_at = report.previous.get("scanned_at")
+    since = (
+        f"Crecimiento desde el <t:{int(previous_at)}:R>."
+        if previous_at
+        else "Primer análisis: aún no hay datos de crecimiento."
+    )
+    pages = paginate_lines(describe_disk_usage(report))
+    await interaction.followup.send(f"```\n{pages[0]}\n```{since}")
+
+
+# Contadores de RCONPoolStats que se exponen en Prometheus: (atributo, métrica, ayuda).
+_POOL_COUNTERS = (
+    ("acquires", "acquires_total", "Conexiones prestadas por el pool."),
+    ("reuses", "reuses_total", "Préstamos servidos con una conexión ya abierta."),
+    ("connections_created", "connections_created_total", "Conexiones abiertas."),
+    ("connections_discarded", "connections_discarded_total", "Conexiones cerradas."),
+    ("reconnects", "reconnects_total", "Reintentos tras perder la conexión."),
+    ("total_wait", "wait_seconds_total", "Tiempo total esperando un hueco libre."),
+)
+
+
+def rcon_pool_metrics() -> list[str]:
+    """Estadísticas de los pools RCON en formato Prometheus, por host:puerto."""
+    lines = []
+    pools = sorted(
+        ((f"{host}:{port}", pool) for (host, port, _), pool in _rcon_pools.items()),
+        key=lambda item: item[0],
+    )
+    for attribute, name, help_text in _POOL_COUNTERS:
+        lines.append(f"# HELP servercontrol_rcon_pool_{name} {help_text}")
+        lines.append(f"# TYPE servercontrol_rcon_pool_{name} counter")
+        for server, pool in pools:
+            value = getattr(pool.stats, attribute)
+            lines.append(f'servercontrol_rcon_pool_{name}{{server="{server}"}} {value}')
+    lines.append(
+        "# HELP servercontrol_rcon_pool_wait_seconds_max Espera máxima por un hueco libre."
+    )
+    lines.append("# TYPE servercontrol_rcon_pool_wait_seconds_max gauge")
+    for server, pool in pools:
+        lines.append(
+            f'servercontrol_rcon_pool_wait_seconds_max{{server="{server}"}} {pool.stats.max_wait}'
+        )
+    return lines
+
+
+metrics.add_collector(rcon_pool_metrics)
+
+
+def describe_rcon_pools() -> list[str]:
+    """Reutilización de conexiones y espera en cada pool RCON."""
+    lines = []
+    for (host, port, _), pool in sorted(_rcon_pools.items()):
+        stats = pool.stats
+        lines.append(
+            f"RCON {host}:{port}: {stats.acquires} usos, "
+            f"{stats.reuse_ratio:.0%} con conexión reutilizada, "
+            f"espera media {stats.avg_wait * 1000:.1f} ms "
+            f"(máx. {stats.max_wait * 1000:.0f} ms), {stats.reconnects} reconexiones"
+        )
+    return lines
+
+
+def describe_metrics() -> list[str]:
+    """Tabla de latencias por comando: percentiles del total y media por fase."""
+
+    def ms(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return "-"
+        if seconds == float("inf"):
+            return ">60s"
+        return f"{seconds * 1000:.0f}"
+
+    commands = sorted({command for command, _ in metrics.histograms})
+    lines = [
+        "Percentiles aproximados (límite superior del cubo), en ms.",
+        f"{'comando':<14} {'n':>5} {'p50':>6} {'p95':>6} {'p99':>6}  medias por fase",
+    ]
+    for command in commands:
+        total = metrics.histograms[(command, "total")]
+        phases = ", ".join(
+            f"{name} {ms(histogram.sum / histogram.count)}"
+            for (cmd, name), histogram in sorted(metrics.histograms.items())
+            if cmd == command and name != "total" and histogram.count
+        )
+        lines.append(
+            f"{command:<14} {total.count:>5} {ms(total.quantile(0.5)):>6} "
+            f"{ms(total.quantile(0.95)):>6} {ms(total.quantile(0.99)):>6}  {phases}"
+        )
+    errors = sum(
+        n for (_, outcome), n in metrics.outcomes.items() if outcome == "error"
+    )
+    limited = sum(
+        n for (_, outcome), n in metrics.outcomes.items() if outcome == "rate_limited"
+    )
+    lines.append(
+        f"\nErrores: {errors}. Limitados por uso: {limited}. "
+        f"Datos desde <t:{int(metrics.started_at)}:R>."
+    )
+    return lines
+
+
+async def show_bot_stats(interaction: discord.Interaction):
+    """Muestra la latencia de los comandos desde que arrancó el bot."""
+    await interaction.response.defer(ephemeral=True)
+    if not metrics.histograms:
+        await interaction.followup.send("Aún no se ha ejecutado ningún comando.")
+        return
+    *table, footer = describe_metrics()
+    pools = describe_rcon_pools()
+    if pools:
+        table += [""] + pools
+    pages = paginate_lines(table)
+    await interaction.followup.send(f"```\n{pages[0]}\n```{footer}")
+
+
+async def run_rcon_command(
+    interaction: discord.Interaction,
+    config: MinecraftConfig,
+    command: str,
+    attachment: bool = False,
+):
+    """
+    Ejecuta un comando de consola por RCON y muestra su salida. Si no cabe en un
+    mensaje se pagina con botones (las páginas salen de `_rcon_outputs`, sin
+    volver a ejecutar el comando); con `attachment`, o si es muy larga, se envía
+    como fichero generado en memoria. El comando nunca se reintenta: podría
+    ejecutarse dos veces.
+    """
+    await interaction.response.defer(ephemeral=True)
+    command = command.removeprefix("/")
+    try:
+        output = strip_color_codes(
+            await get_rcon_pool(config).execute(command, retry=False)
+        )
+    except (RCONConnectionError, RCONAuthError) as e:
+        await interaction.followup.send(f"**Error de RCON:** {e}")
+        return
+    except asyncio.TimeoutError:
+        await interaction.followup.send(
+            "**Error de RCON:** el servidor no respondió a tiempo. "
+            "El comando puede haberse ejecutado igualmente."
+        )
+        return
+
+    if not output.strip():
+        await interaction.followup.send(
+            f"`{command}` se ejecutó sin devolver ninguna salida."
+        )
+        return
+
+    key, entry = _rcon_outputs.put(command, output)
+    if attachment or len(entry.pages) > RCON_MAX_PAGES:
+        _rcon_outputs.discard(key)
+        file = discord.File(io.BytesIO(output.encode("utf-8")), filename="rcon.txt")
+        await interaction.followup.send(f"Salida de `{command}`:", file=file)
+        return
+
+    if len(entry.pages) == 1:
+        _rcon_outputs.discard(key)
+        await interaction.followup.send(render_page(entry, 0))
+        return
+
+    view = RCONOutputView(_rcon_outputs, key, len(entry.pages))
+    view.message = await interaction.followup.send(
+        render_page(entry, 0), view=view, wait=True
+    )
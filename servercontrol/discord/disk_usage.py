@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Union
+
+CACHE_FILENAME = "servercontrol-disk.json"
+CACHE_VERSION = 2
+# Nombre con el que se agrupan los ficheros sueltos en la raíz del servidor.
+ROOT_LABEL = "(raíz)"
+
+
+@dataclass
+class DiskUsageReport:
+    """Uso de disco agregado de un servidor y el del análisis anterior."""
+
+    total: int
+    top_level: dict[str, int]
+    dimensions: dict[str, int]
+    regions: dict[str, int]
+    scanned_at: float
+    dirs_scanned: int = 0
+    previous: dict = field(default_factory=dict)
+
+    def growth(self, section: str, key: Optional[str] = None) -> Optional[int]:
+        """
+        Diferencia en bytes con el análisis anterior. `section` es "total" o el
+        nombre de uno de los diccionarios (p. ej. "dimensions") junto con `key`.
+        """
+        if not self.previous:
+            return None
+        if section == "total":
+            return self.total - self.previous["total"]
+        before = self.previous.get(section, {}).get(key)
+        return None if before is None else getattr(self, section)[key] - before
+
+    def summary(self) -> dict:
+        return {
+            "total": self.total,
+            "top_level": self.top_level,
+            "dimensions": self.dimensions,
+            "regions": self.regions,
+            "scanned_at": self.scanned_at,
+        }
+
+
+class DiskUsageAnalyzer:
+    """
+    Analiza el uso de disco del directorio de un servidor.
+
+    Recorre el árbol con `os.scandir` repartiendo los directorios entre un pool
+    de hilos. No se cachean listados: los .mca crecen sin cambiar el mtime de
+    ningún directorio, así que hay que consultar cada fichero en cada análisis.
+    Los totales del último análisis se guardan en disco para calcular el
+    crecimiento entre ejecuciones. Los enlaces duros (p. ej. copias de seguridad
+    deduplicadas) se cuentan una sola vez.
+    """
+
+    def __init__(
+        self,
+        root: Union[Path, str],
+        cache_path: Optional[Path] = None,
+        workers: int = 8,
+    ):
+        self.root = Path(root)
+        self.cache_path = cache_path or self.root / CACHE_FILENAME
+        self.workers = workers
+        self._previous: dict = {}
+        # El propio fichero de totales (y su temporal) no cuentan en el análisis.
+        self._excluded = {
+            os.path.abspath(self.cache_path),
+            os.path.abspath(self.cache_path.with_suffix(".tmp")),
+        }
+        self._lock = asyncio.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") in (1, CACHE_VERSION):
+            self._previous = data["summary"]
+
+    def _save(self, summary: dict):
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": CACHE_VERSION, "summary": summary}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.cache_path)
+
+    def _scan_dir(self, relative: str) -> Optional[tuple[str, dict, list[str]]]:
+        """
+        Devuelve (ruta relativa, ficheros, subdirectorios). Cada fichero se guarda
+        como (tamaño, (st_dev, st_ino)); la identidad solo se guarda si el fichero
+        tiene más de un enlace duro, que es cuando puede repetirse.
+        """
+        path = os.path.join(self.root, relative)
+        files: dict[str, tuple[int, Optional[tuple[int, int]]]] = {}
+        dirs: list[str] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        if os.path.abspath(entry.path) in self._excluded:
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        identity = (
+                            (stat.st_dev, stat.st_ino) if stat.st_nlink > 1 else None
+                        )
+                        files[entry.name] = (stat.st_size, identity)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return None
+        return relative, files, dirs
+
+    def scan(self) -> DiskUsageReport:
+        """Analiza el árbol completo (bloqueante) y guarda los totales."""
+        dirs: dict[str, dict] = {}
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="disk-usage"
+        ) as executor:
+            pending = {executor.submit(self._scan_dir, "")}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is None:
+                        continue
+                    relative, files, subdirs = result
+                    dirs[relative] = files
+                    for name in subdirs:
+                        child = f"{relative}/{name}" if relative else name
+                        pending.add(executor.submit(self._scan_dir, child))
+
+        report = self._aggregate(dirs)
+        report.dirs_scanned = len(dirs)
+        report.previous = self._previous
+        self._previous = report.summary()
+        self._save(self._previous)
+        return report
+
+    def _aggregate(self, dirs: dict[str, dict]) -> DiskUsageReport:
+        # Una dimensión es cualquier directorio con un subdirectorio "region" con
+        # ficheros .mca: world, world/DIM-1, world/dimensions/<ns>/<id>...
+        dimensions_set = {
+            relative.rpartition("/")[0]
+            for relative, files in dirs.items()
+            if relative.rpartition("/")[2] == "region"
+            and any(name.endswith(".mca") for name in files)
+        }
+
+        def dimension_of(relative: str) -> Optional[str]:
+            while relative:
+                if relative in dimensions_set:
+                    return relative
+                relative = relative.rpartition("/")[0]
+            return "" if "" in dimensions_set else None
+
+        total = 0
+        top_level: dict[str, int] = {}
+        dimensions: dict[str, int] = {}
+        regions: dict[str, int] = {}
+        # Los inodos solo son únicos dentro de un mismo sistema de ficheros.
+        seen: set[tuple[int, int]] = set()
+        # En orden para que un enlace duro se atribuya siempre al mismo directorio.
+        for relative, files in sorted(dirs.items()):
+            top = relative.partition("/")[0] or ROOT_LABEL
+            dimension = dimension_of(relative)
+            is_region_dir = relative.rpartition("/")[2] == "region"
+            for name, (size, identity) in files.items():
+                if identity is not None:
+                    if identity in seen:
+                        continue
+                    seen.add(identity)
+                total += size
+                top_level[top] = top_level.get(top, 0) + size
+                if dimension is not None:
+                    dimensions[dimension] = dimensions.get(dimension, 0) + size
+                if is_region_dir and name.endswith(".mca"):
+                    regions[f"{relative}/{name}"] = size
+
+        return DiskUsageReport(
+            total=total,
+            top_level=top_level,
+            dimensions=dimensions,
+            regions=regions,
+            scanned_at=time.time(),
+        )
+
+    async def analyze(self) -> DiskUsageReport:
+        """Analiza el árbol en un hilo aparte; los análisis concurrentes se encolan."""
+        async with self._lock:
+            return await asyncio.to_thread(self.scan)
@@ -5,4 +5,5 @@ class ServerStatus(Enum):
     ONLINE = "Online"
     OFFLINE = "Offline"
     STARTING = "Starting"
+    STOPPING = "Stopping"
     UNKNOWN = "Unknown"
@@ -1,37 +1,160 @@
 import json
+import logging
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteGuildStore:
+    """
+    Almacén clave/valor por servidor sobre SQLite en modo WAL.
+
+    Cada ajuste es una fila (guild_id, key) que se actualiza con un UPSERT, así
+    que guardar un valor es atómico y no reescribe la configuración del resto
+    de servidores. Todas las operaciones se ejecutan en un único hilo dedicado
+    dueño de la conexión; las escrituras se encolan sin bloquear a quien llama.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="guild-config"
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor.submit(self._open).result()
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS guild_settings ("
+            " guild_id INTEGER NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " PRIMARY KEY (guild_id, key))"
+        )
+        self._conn.commit()
+
+    def _load_all(self) -> dict[str, dict[str, Any]]:
+        data: dict[str, dict[str, Any]] = {}
+        rows = self._conn.execute(  # type: ignore
+            "SELECT guild_id, key, value FROM guild_settings"
+        )
+        for guild_id, key, value in rows:
+            data.setdefault(str(guild_id), {})[key] = json.loads(value)
+        return data
+
+    def load_all(self) -> dict[str, dict[str, Any]]:
+        """Lee todos los ajustes (bloqueante; pensado para el arranque)."""
+        return self._executor.submit(self._load_all).result()
+
+    def _write(self, items: list[tuple[int, str, Any]]):
+        with self._conn:  # type: ignore
+            self._conn.executemany(  # type: ignore
+                "INSERT INTO guild_settings (guild_id, key, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (guild_id, key) DO UPDATE SET value = excluded.value",
+                [(guild_id, key, json.dumps(value)) for guild_id, key, value in items],
+            )
+
+    def write(self, items: list[tuple[int, str, Any]]) -> Future:
+        """Encola una escritura de varios ajustes en una sola transacción."""
+        future = self._executor.submit(self._write, items)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future):
+        if future.exception() is not None:
+            logger.error("No se pudo guardar la configuración: %s", future.exception())
+
+    def close(self):
+        """Espera a las escrituras pendientes y cierra la conexión."""
+        self._executor.submit(self._conn.close).result()  # type: ignore
+        self._executor.shutdown()
 
 
 class GuildConfigManager:
-    """Gestiona la configuración específica de cada servidor (guild)."""
+    """
+    Gestiona la configuración específica de cada servidor (guild).
+
+    Las lecturas salen de una caché en memoria; las escrituras actualizan la
+    caché al momento y se persisten en segundo plano en una base de datos SQLite.
+    Si existe el antiguo `guild_configs.json` junto a la base de datos y esta
+    está vacía, se importa al arrancar.
+    """
 
     def __init__(self, config_path: Path):
         self.config_path = config_path
+        self.store = SQLiteGuildStore(config_path)
         self.config_data = self._load_config()
+        # Índice en memoria guild_id -> ID del rol de admin, para no convertir
+        # claves ni recorrer la configuración en cada comprobación de permisos.
+        self._admin_role_ids: dict[int, int] = {
+            int(guild_id): data["admin_role_id"]
+            for guild_id, data in self.config_data.items()
+            if data.get("admin_role_id") is not None
+        }
 
     def _load_config(self) -> dict:
-        """Carga la configuración desde el archivo JSON."""
-        if self.config_path.exists():
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {}
-
-    def _save_config(self):
-        """Guarda la configuración actual en el archivo JSON."""
-        with open(self.config_path, "w", encoding="utf-8") as f:
-            json.dump(self.config_data, f, indent=4)
-
-    def set_admin_role(self, guild_id: int, role_name: str):
-        """Guarda el nombre del rol de administrador para un servidor."""
-        guild_id_str = str(guild_id)
-        if guild_id_str not in self.config_data:
-            self.config_data[guild_id_str] = {}
-
-        self.config_data[guild_id_str]["admin_role"] = role_name
-        self._save_config()
+        """Carga la configuración de la base de datos, migrando el JSON antiguo."""
+        data = self.store.load_all()
+        legacy_path = self.config_path.with_suffix(".json")
+        if not data and legacy_path.exists():
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.store.write(
+                [
+                    (int(guild_id), key, value)
+                    for guild_id, settings in data.items()
+                    for key, value in settings.items()
+                ]
+            ).result()
+        return data
+
+    def set(self, guild_id: int, **settings: Any) -> Future:
+        """Guarda uno o varios ajustes de un servidor de forma atómica."""
+        self.config_data.setdefault(str(guild_id), {}).update(settings)
+        return self.store.write(
+            [(guild_id, key, value) for key, value in settings.items()]
+        )
+
+    def get(self, guild_id: int, key: str, default: Any = None) -> Any:
+        """Obtiene un ajuste de un servidor."""
+        return self.config_data.get(str(guild_id), {}).get(key, default)
+
+    def set_admin_role(
+        self, guild_id: int, role_name: str, role_id: Optional[int] = None
+    ):
+        """
+        Guarda el rol de administrador para un servidor. El ID es lo que se usa
+        para comprobar permisos; el nombre solo se guarda para los mensajes.
+        """
+        if role_id is None:
+            self._admin_role_ids.pop(guild_id, None)
+        else:
+            self._admin_role_ids[guild_id] = role_id
+        self.set(guild_id, admin_role=role_name, admin_role_id=role_id)
+
+    def clear_admin_role(self, guild_id: int):
+        """
+        Olvida el rol de administrador (nombre e ID). Sin el nombre, ningún rol
+        creado después con ese nombre hereda los permisos: hay que usar /setup.
+        """
+        self._admin_role_ids.pop(guild_id, None)
+        self.set(guild_id, admin_role=None, admin_role_id=None)
 
     def get_admin_role(self, guild_id: int) -> Optional[str]:
         """Obtiene el nombre del rol de administrador para un servidor."""
-        guild_id_str = str(guild_id)
-        return self.config_data.get(guild_id_str, {}).get("admin_role")
+        return self.get(guild_id, "admin_role")
+
+    def get_admin_role_id(self, guild_id: int) -> Optional[int]:
+        """Obtiene el ID del rol de administrador para un servidor."""
+        return self._admin_role_ids.get(guild_id)
+
+    def close(self):
+        """Espera a que terminen las escrituras pendientes."""
+        self.store.close()
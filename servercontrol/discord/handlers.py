@@ -1,6 +1,7 @@
-from collections.abc import Sequence
+import hashlib
+import json
 from pathlib import Path
-from typing import cast
+from typing import Optional
 
 import discord
 from discord import app_commands
@@ -11,27 +12,61 @@ from servercontrol.config import ManagerConfig
 from servercontrol.discord.guild_config import GuildConfigManager
 
 from .commands import (
+    backup_minecraft_server,
+    check_all_servers_status,
     check_server_status,
     echo,
+    get_last_ping,
+    get_minecraft_server_status,
+    get_player_cache,
+    run_rcon_command,
+    search_server_logs,
     setup_bot_role,
+    show_bot_stats,
+    show_disk_usage,
+    show_server_logs,
+    start_player_sampler,
     start_minecraft_server,
     stop_minecraft_server,
 )
 from .logging_utils import log_command_usage, setup_command_logger
+from .metrics import start_metrics_server_task
+from .monitor import ServerMonitor
+from .ratelimit import CommandLimits, RateLimit, RateLimiter
+from .status_board import StatusBoard
 
-config_manager = GuildConfigManager(Path("guild_configs.json"))
+config_manager = GuildConfigManager(Path("guild_configs.db"))
 command_logger = setup_command_logger()
-log_command = log_command_usage(command_logger)
+
+# Límites de uso por comando. Los que lanzan sondeos o tocan el servidor son
+# más estrictos; el resto usa DEFAULT_LIMITS.
+DEFAULT_LIMITS = CommandLimits(
+    user=RateLimit(10, 60), guild=RateLimit(60, 60), global_=RateLimit(200, 60)
+)
+COMMAND_LIMITS = {
+    "server_status": CommandLimits(
+        user=RateLimit(5, 60), guild=RateLimit(30, 60), global_=RateLimit(100, 60)
+    ),
+    "server_start": CommandLimits(user=RateLimit(2, 60), guild=RateLimit(5, 60)),
+    "server_stop": CommandLimits(user=RateLimit(2, 60), guild=RateLimit(5, 60)),
+    "server_backup": CommandLimits(user=RateLimit(1, 300), guild=RateLimit(2, 300)),
+    "server_disk": CommandLimits(user=RateLimit(2, 60), guild=RateLimit(5, 60)),
+    "log_search": CommandLimits(user=RateLimit(5, 60), guild=RateLimit(15, 60)),
+    "rcon": CommandLimits(user=RateLimit(10, 60), guild=RateLimit(30, 60)),
+}
+rate_limiter = RateLimiter(COMMAND_LIMITS, DEFAULT_LIMITS)
+log_command = log_command_usage(command_logger, rate_limiter)
 
 
 async def is_admin(interaction: discord.Interaction) -> bool:
     """
     Verifica si el usuario tiene el rol de admin configurado para este servidor.
     """
-    # 1. Obtener el nombre del rol guardado para este servidor
-    id_ = cast(int, getattr(interaction.guild, "id", None))
-    admin_role_name = config_manager.get_admin_role(id_)
-    if id_ is None or not admin_role_name:
+    # 1. Obtener el rol guardado para este servidor
+    guild = interaction.guild
+    role_id = config_manager.get_admin_role_id(guild.id) if guild else None
+    admin_role_name = config_manager.get_admin_role(guild.id) if guild else None
+    if guild is None or (role_id is None and not admin_role_name):
         await interaction.response.send_message(
             "El rol de administrador no ha sido configurado en este servidor. "
             "Un administrador debe usar el comando `/setup` primero.",
@@ -40,9 +75,15 @@ async def is_admin(interaction: discord.Interaction) -> bool:
         return False
 
     # 2. Verificar si el rol existe en el servidor
-    roles: Sequence[discord.Role] = getattr(interaction.guild, "roles", [])
-    role = discord.utils.get(roles, name=admin_role_name)
-    if not role:
+    if role_id is None:
+        # Configuración antigua (solo el nombre) o rol borrado: se busca por
+        # nombre una única vez y se guarda su ID.
+        role = discord.utils.get(guild.roles, name=admin_role_name)
+        if role is not None:
+            config_manager.set_admin_role(guild.id, role.name, role.id)
+    else:
+        role = guild.get_role(role_id)
+    if role is None:
         await interaction.response.send_message(
             f"El rol configurado ('{admin_role_name}') ya no existe. "
             "Un administrador debe usar `/setup` para reconfigurarlo.",
@@ -50,11 +91,11 @@ async def is_admin(interaction: discord.Interaction) -> bool:
         )
         return False
 
-    # 3. Verificar si el usuario tiene ese rol
-    user_roles: Sequence[discord.Role] = getattr(interaction.user, "roles", [])
-    if role not in user_roles:
+    # 3. Verificar si el usuario tiene ese rol (búsqueda por ID, sin recorrer sus roles)
+    member = interaction.user
+    if not isinstance(member, discord.Member) or member.get_role(role.id) is None:
         await interaction.response.send_message(
-            f"No tienes el rol '{admin_role_name}' necesario para usar este comando.",
+            f"No tienes el rol '{role.name}' necesario para usar este comando.",
             ephemeral=True,
         )
         return False
@@ -62,9 +103,103 @@ async def is_admin(interaction: discord.Interaction) -> bool:
     return True
 
 
+def command_tree_hash(
+    tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake]
+) -> str:
+    """
+    Hash del árbol de comandos tal y como se enviaría a Discord al sincronizar.
+    Si no cambia, los comandos registrados en Discord siguen al día.
+    """
+    payload = []
+    for command in tree.get_commands(guild=guild):
+        try:
+            payload.append(command.to_dict(tree))  # type: ignore
+        except TypeError:
+            payload.append(command.to_dict())  # type: ignore  # discord.py < 2.4
+    payload.sort(key=lambda command: command["name"])
+    serialized = json.dumps(
+        [tree.client.application_id, payload], sort_keys=True, default=str
+    )
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
 def register_handlers_discord(bot: commands.Bot, config: ManagerConfig):
     """Registra los slash commands y eventos para el bot de Discord."""
 
+    servers = config.minecraft_servers
+    default_server = next(iter(servers))
+
+    # Monitores de estado en segundo plano, uno por servidor: los comandos leen
+    # su estado sin sondear.
+    monitors: dict[str, ServerMonitor] = {}
+    for name, server_config in servers.items():
+        monitors[name] = ServerMonitor(
+            lambda c=server_config: get_minecraft_server_status(c, force=True)
+        )
+        monitors[name].start()
+        # Caché de jugadores para autocompletar, sin E/S en cada pulsación.
+        start_player_sampler(server_config, monitors[name])
+
+        # Tablero de estado: un mensaje que se edita solo cuando algo cambia.
+        if config.discord_config.status_channel_id:
+            StatusBoard(
+                bot,
+                config.discord_config.status_channel_id,
+                monitors[name],
+                lambda c=server_config: get_last_ping(c),
+                config_manager,
+                name=name if len(servers) > 1 else None,
+            ).start()
+
+    if config.discord_config.metrics_port:
+        start_metrics_server_task(config.discord_config.metrics_port)
+
+    async def server_autocomplete(
+        interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        current = current.lower()
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in servers
+            if current in name.lower()
+        ][:25]
+
+    async def server_status_autocomplete(
+        interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        choices = await server_autocomplete(interaction, current)
+        if len(servers) > 1 and "all".startswith(current.lower()):
+            choices.insert(0, app_commands.Choice(name="all (todos)", value="all"))
+        return choices[:25]
+
+    async def player_autocomplete(
+        interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        server_config = servers.get(interaction.namespace.server or default_server)
+        if server_config is None:
+            return []
+        return [
+            app_commands.Choice(name=player, value=player)
+            for player in get_player_cache(server_config).complete(current)
+        ]
+
+    async def resolve_server(
+        interaction: discord.Interaction, server: Optional[str]
+    ) -> Optional[str]:
+        """
+        Devuelve el nombre del servidor elegido (por defecto, el primero). Si no
+        existe, responde a la interacción y devuelve None.
+        """
+        name = server or default_server
+        if name in servers:
+            return name
+        await interaction.response.send_message(
+            f"No existe el servidor '{server}'. Servidores disponibles: "
+            + ", ".join(f"`{name}`" for name in servers),
+            ephemeral=True,
+        )
+        return None
+
     # Comando setup
     @bot.tree.command(
         name="setup",
@@ -107,10 +242,19 @@ def register_handlers_discord(bot: commands.Bot, config: ManagerConfig):
             else None
         ),
     )
+    @app_commands.describe(
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete)
     @app_commands.check(is_admin)
     @log_command
-    async def server_start(interaction: discord.Interaction):
-        await start_minecraft_server(interaction, config.minecraft_config)
+    async def server_start(
+        interaction: discord.Interaction, server: Optional[str] = None
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await start_minecraft_server(interaction, servers[name], monitors[name])
 
     @server_start.error
     async def server_start_error(
@@ -140,10 +284,22 @@ def register_handlers_discord(bot: commands.Bot, config: ManagerConfig):
             else None
         ),
     )
+    @app_commands.describe(
+        backup="Hacer una copia de seguridad del mundo antes de detenerlo.",
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete)
     @app_commands.check(is_admin)
     @log_command
-    async def server_stop(interaction: discord.Interaction):
-        await stop_minecraft_server(interaction, config.minecraft_config)
+    async def server_stop(
+        interaction: discord.Interaction,
+        backup: bool = False,
+        server: Optional[str] = None,
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await stop_minecraft_server(interaction, servers[name], monitors[name], backup)
 
     @server_stop.error
     async def server_stop_error(
@@ -164,6 +320,76 @@ def register_handlers_discord(bot: commands.Bot, config: ManagerConfig):
                 f"Ocurrió un error: {error}", ephemeral=True
             )
 
+    # Comando copia de seguridad del mundo
+    @bot.tree.command(
+        name="server_backup",
+        description="Crea una copia de seguridad incremental del mundo.",
+        guild=(
+            discord.Object(id=config.discord_config.guild_id)
+            if config.discord_config.guild_id
+            else None
+        ),
+    )
+    @app_commands.describe(
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.check(is_admin)
+    @log_command
+    async def server_backup(
+        interaction: discord.Interaction, server: Optional[str] = None
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await backup_minecraft_server(interaction, servers[name])
+
+    @server_backup.error
+    async def server_backup_error(
+        interaction: discord.Interaction, error: AppCommandError
+    ):
+        if isinstance(error, CheckFailure):
+            print(
+                f"Check 'is_admin' fallido para el usuario {interaction.user} en el comando /server_backup. Mensaje ya enviado."
+            )
+            return
+        await interaction.followup.send(f"Ocurrió un error: {error}", ephemeral=True)
+
+    # Comando uso de disco del servidor
+    @bot.tree.command(
+        name="server_disk",
+        description="Muestra el uso de disco del servidor por dimensión y región.",
+        guild=(
+            discord.Object(id=config.discord_config.guild_id)
+            if config.discord_config.guild_id
+            else None
+        ),
+    )
+    @app_commands.describe(
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.check(is_admin)
+    @log_command
+    async def server_disk(
+        interaction: discord.Interaction, server: Optional[str] = None
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await show_disk_usage(interaction, servers[name])
+
+    @server_disk.error
+    async def server_disk_error(
+        interaction: discord.Interaction, error: AppCommandError
+    ):
+        if isinstance(error, CheckFailure):
+            print(
+                f"Check 'is_admin' fallido para el usuario {interaction.user} en el comando /server_disk. Mensaje ya enviado."
+            )
+            return
+        await interaction.followup.send(f"Ocurrió un error: {error}", ephemeral=True)
+
     # Comando estado del servidor
     @bot.tree.command(
         name="server_status",
@@ -174,9 +400,188 @@ def register_handlers_discord(bot: commands.Bot, config: ManagerConfig):
             else None
         ),
     )
+    @app_commands.describe(
+        server="Servidor de Minecraft, o `all` para ver todos a la vez."
+    )
+    @app_commands.autocomplete(server=server_status_autocomplete)
+    @log_command
+    async def server_status(
+        interaction: discord.Interaction, server: Optional[str] = None
+    ):
+        if server == "all":
+            await check_all_servers_status(interaction, servers, monitors)
+            return
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await check_server_status(interaction, servers[name], monitors[name])
+
+    # Comando log del servidor
+    @bot.tree.command(
+        name="server_logs",
+        description="Muestra las últimas líneas del log del servidor de Minecraft.",
+        guild=(
+            discord.Object(id=config.discord_config.guild_id)
+            if config.discord_config.guild_id
+            else None
+        ),
+    )
+    @app_commands.describe(
+        lines="Número de líneas a mostrar (por defecto 20).",
+        filter="Expresión regular para mostrar solo las líneas que coincidan.",
+        page="Página a mostrar si la salida no cabe en un mensaje (1 = más reciente).",
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.check(is_admin)
+    @log_command
+    async def server_logs(
+        interaction: discord.Interaction,
+        lines: app_commands.Range[int, 1, 1000] = 20,
+        filter: Optional[str] = None,
+        page: app_commands.Range[int, 1] = 1,
+        server: Optional[str] = None,
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await show_server_logs(interaction, servers[name], lines, filter, page)
+
+    @server_logs.error
+    async def server_logs_error(
+        interaction: discord.Interaction, error: AppCommandError
+    ):
+        if isinstance(error, CheckFailure):
+            print(
+                f"Check 'is_admin' fallido para el usuario {interaction.user} en el comando /server_logs. Mensaje ya enviado."
+            )
+            return
+        await interaction.followup.send(f"Ocurrió un error: {error}", ephemeral=True)
+
+    # Comando de búsqueda en los logs rotados
+    @bot.tree.command(
+        name="log_search",
+        description="Busca jugadores o eventos en el historial de logs del servidor.",
+        guild=(
+            discord.Object(id=config.discord_config.guild_id)
+            if config.discord_config.guild_id
+            else None
+        ),
+    )
+    @app_commands.describe(
+        player="Nombre del jugador a buscar.",
+        event="Tipo de evento a buscar.",
+        limit="Número máximo de resultados (por defecto 20).",
+        page="Página a mostrar si la salida no cabe en un mensaje (1 = más reciente).",
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete, player=player_autocomplete)
+    @app_commands.choices(
+        event=[
+            app_commands.Choice(name="Entrada al servidor", value="join"),
+            app_commands.Choice(name="Salida del servidor", value="leave"),
+            app_commands.Choice(name="Chat", value="chat"),
+            app_commands.Choice(name="Error", value="error"),
+            app_commands.Choice(name="Crash", value="crash"),
+        ]
+    )
+    @app_commands.check(is_admin)
+    @log_command
+    async def log_search(
+        interaction: discord.Interaction,
+        player: Optional[str] = None,
+        event: Optional[app_commands.Choice[str]] = None,
+        limit: app_commands.Range[int, 1, 200] = 20,
+        page: app_commands.Range[int, 1] = 1,
+        server: Optional[str] = None,
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await search_server_logs(
+            interaction,
+            servers[name],
+            player,
+            event.value if event else None,
+            limit,
+            page,
+        )
+
+    @log_search.error
+    async def log_search_error(
+        interaction: discord.Interaction, error: AppCommandError
+    ):
+        if isinstance(error, CheckFailure):
+            print(
+                f"Check 'is_admin' fallido para el usuario {interaction.user} en el comando /log_search. Mensaje ya enviado."
+            )
+            return
+        await interaction.followup.send(f"Ocurrió un error: {error}", ephemeral=True)
+
+    # Comando de consola por RCON
+    @bot.tree.command(
+        name="rcon",
+        description="Ejecuta un comando en la consola del servidor de Minecraft.",
+        guild=(
+            discord.Object(id=config.discord_config.guild_id)
+            if config.discord_config.guild_id
+            else None
+        ),
+    )
+    @app_commands.describe(
+        command="Comando de consola, sin la barra inicial (ej. 'list').",
+        attachment="Enviar la salida como fichero en lugar de paginarla.",
+        server="Servidor de Minecraft (por defecto, el primero configurado).",
+    )
+    @app_commands.autocomplete(server=server_autocomplete)
+    @app_commands.check(is_admin)
+    @log_command
+    async def rcon(
+        interaction: discord.Interaction,
+        command: str,
+        attachment: bool = False,
+        server: Optional[str] = None,
+    ):
+        name = await resolve_server(interaction, server)
+        if name is None:
+            return
+        await run_rcon_command(interaction, servers[name], command, attachment)
+
+    @rcon.error
+    async def rcon_error(interaction: discord.Interaction, error: AppCommandError):
+        if isinstance(error, CheckFailure):
+            print(
+                f"Check 'is_admin' fallido para el usuario {interaction.user} en el comando /rcon. Mensaje ya enviado."
+            )
+            return
+        await interaction.followup.send(f"Ocurrió un error: {error}", ephemeral=True)
+
+    # Comando estadísticas de latencia del bot
+    @bot.tree.command(
+        name="bot_stats",
+        description="Muestra la latencia de los comandos del bot.",
+        guild=(
+            discord.Object(id=config.discord_config.guild_id)
+            if config.discord_config.guild_id
+            else None
+        ),
+    )
     @log_command
-    async def server_status(interaction: discord.Interaction):
-        await check_server_status(interaction, config.minecraft_config)
+    async def bot_stats(interaction: discord.Interaction):
+        await show_bot_stats(interaction)
+
+    # Eventos que mantienen al día el rol de admin guardado
+    @bot.event
+    async def on_guild_role_update(before: discord.Role, after: discord.Role):
+        if config_manager.get_admin_role_id(after.guild.id) != after.id:
+            return
+        if before.name != after.name:
+            config_manager.set_admin_role(after.guild.id, after.name, after.id)
+
+    @bot.event
+    async def on_guild_role_delete(role: discord.Role):
+        if config_manager.get_admin_role_id(role.guild.id) == role.id:
+            config_manager.clear_admin_role(role.guild.id)
 
     # Evento que se ejecuta cuando el bot está listo
     @bot.event
@@ -188,7 +593,18 @@ def register_handlers_discord(bot: commands.Bot, config: ManagerConfig):
                 if config.discord_config.guild_id
                 else None
             )
+            # on_ready se repite en cada reconexión: solo se sincroniza si los
+            # comandos cambiaron desde la última vez (o si se fuerza).
+            tree_hash = command_tree_hash(bot.tree, guild)
+            guild_key = guild.id if guild else 0
+            if (
+                not config.discord_config.force_command_sync
+                and config_manager.get(guild_key, "command_tree_hash") == tree_hash
+            ):
+                print("Los comandos no han cambiado; no se sincronizan.")
+                return
             synced = await bot.tree.sync(guild=guild)
+            config_manager.set(guild_key, command_tree_hash=tree_hash)
             print(f"Sincronizados {len(synced)} comandos.")
         except Exception as e:
             print(f"Error al sincronizar comandos: {e}")
@@ -0,0 +1,294 @@
+import asyncio
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from .log_watcher import CRASH_MARKERS
+
+INDEX_FILENAME = "servercontrol-index.json"
+INDEX_VERSION = 1
+
+# Logs rotados por Minecraft: 2024-01-31-1.log.gz
+ARCHIVE_RE = re.compile(r"^(?P<date>\d{4}-\d{2}-\d{2})-\d+\.log\.gz$")
+TIME_RE = re.compile(r"^\[(?P<time>\d{2}:\d{2}:\d{2})")
+PLAYER = r"(?P<player>[A-Za-z0-9_]{1,16})"
+
+# Tipos de evento indexados y la expresión que los reconoce en una línea.
+EVENT_PATTERNS: dict[str, re.Pattern] = {
+    "join": re.compile(rf"\]: {PLAYER} joined the game"),
+    "leave": re.compile(rf"\]: {PLAYER} (?:left the game|lost connection)"),
+    "chat": re.compile(rf"\]: (?:\[Not Secure\] )?<{PLAYER}> "),
+    "error": re.compile(r"/ERROR\]"),
+    "crash": re.compile("|".join(re.escape(marker) for marker in CRASH_MARKERS)),
+}
+# Nombres de jugador que aparecen en líneas que no son eventos indexados.
+PLAYER_MENTION_RE = re.compile(
+    r"UUID of player (?P<player>\w{1,16}) is|\]: (?P<login>\w{1,16})\[/"
+)
+
+
+@dataclass
+class LogMatch:
+    """Una línea encontrada en los logs."""
+
+    file: str
+    date: str
+    time: str
+    line: str
+
+
+def _index_archive(path: Path) -> dict:
+    """Lee un log comprimido y extrae su rango horario, eventos y jugadores."""
+    first_time = last_time = None
+    events: dict[str, int] = {}
+    players: set[str] = set()
+    with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            time_match = TIME_RE.match(line)
+            if time_match:
+                last_time = time_match.group("time")
+                first_time = first_time or last_time
+            for event, pattern in EVENT_PATTERNS.items():
+                match = pattern.search(line)
+                if match:
+                    events[event] = events.get(event, 0) + 1
+                    player = match.groupdict().get("player")
+                    if player:
+                        players.add(player.lower())
+            mention = PLAYER_MENTION_RE.search(line)
+            if mention:
+                players.add((mention.group("player") or mention.group("login")).lower())
+
+    stat = path.stat()
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "date": ARCHIVE_RE.match(path.name).group("date"),  # type: ignore
+        "first": first_time,
+        "last": last_time,
+        "events": events,
+        "players": sorted(players),
+    }
+
+
+def _grep(
+    path: Path, date: str, player: Optional[str], event: Optional[str]
+) -> list[LogMatch]:
+    """Devuelve las líneas de un log (comprimido o no) que cumplen los criterios."""
+    opener = gzip.open if path.suffix == ".gz" else open
+    event_pattern = EVENT_PATTERNS[event] if event else None
+    player_re = (
+        re.compile(rf"\b{re.escape(player)}\b", re.IGNORECASE) if player else None
+    )
+
+    matches = []
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:  # type: ignore
+        for line in f:
+            if event_pattern is not None and not event_pattern.search(line):
+                continue
+            if player_re is not None and not player_re.search(line):
+                continue
+            time_match = TIME_RE.match(line)
+            matches.append(
+                LogMatch(
+                    file=path.name,
+                    date=date,
+                    time=time_match.group("time") if time_match else "",
+                    line=line.rstrip("\n"),
+                )
+            )
+    return matches
+
+
+class LogIndex:
+    """
+    Índice incremental de los logs rotados (`logs/*.log.gz`) de un servidor.
+
+    Guarda por fichero su fecha, rango horario, número de eventos por tipo y los
+    jugadores que aparecen, y a partir de ahí mantiene en memoria índices
+    invertidos jugador → ficheros y evento → ficheros. El índice se persiste
+    como checkpoint tras cada lote, y solo se procesan ficheros nuevos o
+    modificados. La descompresión se hace en un pool de hilos.
+    """
+
+    def __init__(
+        self,
+        logs_dir: Union[Path, str],
+        index_path: Optional[Path] = None,
+        workers: int = min(4, os.cpu_count() or 1),
+    ):
+        self.logs_dir = Path(logs_dir)
+        self.index_path = index_path or self.logs_dir / INDEX_FILENAME
+        self.files: dict[str, dict] = {}
+        self.players: dict[str, set[str]] = {}
+        self.events: dict[str, set[str]] = {}
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="log-index"
+        )
+        self._lock = asyncio.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        for name, entry in data.get("files", {}).items():
+            self._add_postings(name, entry)
+
+    def _save(self):
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": INDEX_VERSION, "files": self.files}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.index_path)
+
+    def _add_postings(self, name: str, entry: dict):
+        self.files[name] = entry
+        for player in entry["players"]:
+            self.players.setdefault(player, set()).add(name)
+        for event in entry["events"]:
+            self.events.setdefault(event, set()).add(name)
+
+    def _remove_postings(self, name: str):
+        entry = self.files.pop(name, None)
+        if entry is None:
+            return
+        for player in entry["players"]:
+            self.players.get(player, set()).discard(name)
+        for event in entry["events"]:
+            self.events.get(event, set()).discard(name)
+
+    def _scan_archives(
+        self, known: dict[str, tuple[int, float]]
+    ) -> tuple[list[Path], set[str]]:
+        """
+        Ficheros rotados que aún no están indexados o que han cambiado según
+        `known` (nombre → tamaño y mtime), y los nombres de todos los presentes.
+        Se ejecuta en un hilo, así que no toca el índice: solo lista el directorio.
+        """
+        pending = []
+        present = set()
+        for entry in os.scandir(self.logs_dir):
+            if not ARCHIVE_RE.match(entry.name):
+                continue
+            present.add(entry.name)
+            stat = entry.stat()
+            if known.get(entry.name) != (stat.st_size, stat.st_mtime):
+                pending.append(Path(entry.path))
+        return pending, present
+
+    async def update(self, batch_size: int = 32) -> int:
+        """Indexa los ficheros nuevos. Devuelve cuántos se procesaron."""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            if not self.logs_dir.is_dir():
+                return 0
+            known = {
+                name: (entry["size"], entry["mtime"])
+                for name, entry in self.files.items()
+            }
+            pending, present = await loop.run_in_executor(
+                self._executor, self._scan_archives, known
+            )
+            # Los índices solo se modifican aquí, en el bucle de eventos y con el
+            # lock, para que candidates() y search() nunca los vean a medias.
+            removed = set(self.files) - present
+            for name in removed:
+                self._remove_postings(name)
+            if removed and not pending:
+                await loop.run_in_executor(self._executor, self._save)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start : start + batch_size]
+                entries = await asyncio.gather(
+                    *(
+                        loop.run_in_executor(self._executor, _index_archive, path)
+                        for path in batch
+                    )
+                )
+                for path, entry in zip(batch, entries):
+                    self._remove_postings(path.name)
+                    self._add_postings(path.name, entry)
+                await loop.run_in_executor(self._executor, self._save)
+            return len(pending)
+
+    def candidates(
+        self, player: Optional[str] = None, event: Optional[str] = None
+    ) -> list[str]:
+        """Ficheros que pueden contener resultados, del más reciente al más antiguo."""
+        names: Optional[set[str]] = None
+        if player:
+            names = set(self.players.get(player.lower(), ()))
+        if event:
+            event_files = self.events.get(event, set())
+            names = event_files if names is None else names & event_files
+        if names is None:
+            names = set(self.files)
+        return sorted(names, key=self._sort_key, reverse=True)
+
+    def _sort_key(self, name: str) -> tuple[str, int]:
+        # 2024-01-31-10.log.gz debe ir después de 2024-01-31-9.log.gz
+        date, _, rest = name[:10], name[10], name[11:]
+        return date, int(rest.split(".", 1)[0])
+
+    async def search(
+        self,
+        player: Optional[str] = None,
+        event: Optional[str] = None,
+        limit: int = 20,
+    ) -> list[LogMatch]:
+        """
+        Busca las coincidencias más recientes. Primero actualiza el índice, luego
+        revisa `latest.log` y solo los ficheros rotados que el índice señala,
+        descomprimiéndolos en paralelo por lotes hasta reunir `limit` resultados.
+        """
+        if event is not None and event not in EVENT_PATTERNS:
+            raise ValueError(f"Tipo de evento desconocido: {event}")
+        await self.update()
+        loop = asyncio.get_running_loop()
+
+        results: list[LogMatch] = []
+        latest = self.logs_dir / "latest.log"
+        if latest.exists():
+            matches = await loop.run_in_executor(
+                self._executor, _grep, latest, "actual", player, event
+            )
+            results.extend(reversed(matches))
+
+        # Copia de las fechas: otro update() puede retirar ficheros mientras se busca.
+        candidates = [
+            (name, self.files[name]["date"]) for name in self.candidates(player, event)
+        ]
+        for start in range(0, len(candidates), self.workers):
+            if len(results) >= limit:
+                break
+            batch = candidates[start : start + self.workers]
+            found = await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        self._executor,
+                        _grep,
+                        self.logs_dir / name,
+                        date,
+                        player,
+                        event,
+                    )
+                    for name, date in batch
+                )
+            )
+            for matches in found:
+                results.extend(reversed(matches))
+
+        return results[:limit]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,46 @@
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Optional, Union
+
+# Con filtro, tope de bytes recorridos hacia atrás para acotar el peor caso.
+DEFAULT_MAX_SCAN_BYTES = 64 * 1024 * 1024
+
+
+def tail_lines(
+    path: Union[Path, str],
+    count: int,
+    pattern: Optional[re.Pattern] = None,
+    max_scan_bytes: int = DEFAULT_MAX_SCAN_BYTES,
+) -> list[str]:
+    """
+    Devuelve las últimas `count` líneas del fichero (solo las que casan con
+    `pattern`, si se indica), en orden cronológico.
+
+    El fichero se proyecta en memoria y se recorre hacia atrás desde el final,
+    línea a línea, así que el coste depende de las líneas leídas y no del tamaño
+    del log. Es bloqueante: desde el bot se llama con `asyncio.to_thread`.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or count <= 0:
+            return []
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lines: list[str] = []
+            end = size - 1 if mm[size - 1] == ord("\n") else size
+            limit = max(0, size - max_scan_bytes)
+            while end > limit and len(lines) < count:
+                # Desde limit - 1 para no perder una línea que empiece justo en el tope.
+                newline = mm.rfind(b"\n", max(limit - 1, 0), end)
+                if newline < 0 and limit > 0:
+                    break  # línea cortada por el tope de bytes: no se devuelve
+                start = newline + 1
+                line = mm[start:end].decode("utf-8", errors="replace").rstrip("\r")
+                if pattern is None or pattern.search(line):
+                    lines.append(line)
+                end = start - 1
+
+    lines.reverse()
+    return lines
@@ -0,0 +1,188 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+# "[12:34:56] [Server thread/INFO]: Done (12.345s)! For help, type "help""
+DONE_RE = re.compile(r"Done \((?P<seconds>[\d.]+)s\)!")
+# Líneas que indican que el arranque ha fallado.
+CRASH_MARKERS = (
+    "---- Minecraft Crash Report ----",
+    "Encountered an unexpected exception",
+    "Failed to start the minecraft server",
+    "Exception in server tick loop",
+    "Error occurred during initialization of VM",
+)
+# Líneas de la traza que se adjuntan al informe de fallo.
+CRASH_CONTEXT_LINES = 12
+
+
+@dataclass
+class ServerReadiness:
+    """Resultado de esperar al arranque del servidor."""
+
+    ready: bool
+    boot_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+class _InotifyWaiter:
+    """Espera cambios en un directorio con inotify (solo Linux), sin sondear."""
+
+    IN_MODIFY = 0x002
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        mask = self.IN_MODIFY | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch")
+
+        self._fd = fd
+        self._changed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+
+    def _on_readable(self):
+        # Solo interesa que hubo cambios: se vacía la cola de eventos sin analizarla.
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        self._changed.set()
+
+    async def wait(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._changed.clear()
+
+    def close(self):
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+
+
+class _PollWaiter:
+    """Alternativa portable: espera un intervalo fijo entre comprobaciones."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+
+    async def wait(self, timeout: float):
+        await asyncio.sleep(min(self.interval, timeout))
+
+    def close(self):
+        pass
+
+
+class LogFollower:
+    """
+    Sigue un fichero de log de forma incremental, como `tail -F`.
+
+    La posición inicial se toma al crear el objeto (el final del fichero actual),
+    y cada lectura solo trae los bytes nuevos. Si el fichero se rota (cambia de
+    inodo o se trunca), se continúa desde el principio del fichero nuevo.
+    """
+
+    def __init__(self, path: Union[Path, str], poll_interval: float = 0.5):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._partial = b""
+        self._waiter: Optional[Union[_InotifyWaiter, _PollWaiter]] = None
+        try:
+            stat = self.path.stat()
+            self._inode, self._offset = stat.st_ino, stat.st_size
+        except FileNotFoundError:
+            pass
+
+    def read_lines(self) -> list[str]:
+        """Devuelve las líneas completas escritas desde la última lectura."""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return []
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Fichero nuevo (rotado al arrancar el servidor) o truncado.
+            self._inode, self._offset, self._partial = stat.st_ino, 0, b""
+        if stat.st_size == self._offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        self._offset += len(data)
+
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        return [line.decode("utf-8", errors="replace").rstrip("\r") for line in lines]
+
+    async def wait(self, timeout: float):
+        """Espera a que el directorio del log cambie, o a que pase `timeout`."""
+        if self._waiter is None:
+            try:
+                self._waiter = _InotifyWaiter(self.path.parent)
+            except (OSError, AttributeError, TypeError):
+                # Sin inotify (otro sistema, directorio aún inexistente...).
+                self._waiter = _PollWaiter(self.poll_interval)
+        await self._waiter.wait(timeout)
+
+    def close(self):
+        if self._waiter is not None:
+            self._waiter.close()
+            self._waiter = None
+
+
+async def wait_for_server_ready(
+    follower: LogFollower, timeout: float = 600.0
+) -> ServerReadiness:
+    """
+    Sigue el log hasta ver la línea `Done (Xs)!` o una traza de fallo de arranque.
+    """
+    deadline = time.monotonic() + timeout
+    crash: Optional[list[str]] = None
+    try:
+        while (remaining := deadline - time.monotonic()) > 0:
+            for line in follower.read_lines():
+                if crash is not None:
+                    crash.append(line)
+                    if len(crash) >= CRASH_CONTEXT_LINES:
+                        return ServerReadiness(ready=False, error="\n".join(crash))
+                    continue
+                match = DONE_RE.search(line)
+                if match:
+                    return ServerReadiness(
+                        ready=True, boot_time=float(match.group("seconds"))
+                    )
+                if any(marker in line for marker in CRASH_MARKERS):
+                    crash = [line]
+
+            if crash is not None:
+                # Se espera un poco por si la traza sigue creciendo.
+                await follower.wait(min(remaining, 1.0))
+                more = follower.read_lines()
+                crash.extend(more[: CRASH_CONTEXT_LINES - len(crash)])
+                if not more or len(crash) >= CRASH_CONTEXT_LINES:
+                    return ServerReadiness(ready=False, error="\n".join(crash))
+                continue
+
+            # Con inotify se despierta al instante; el timeout es solo una red de seguridad.
+            await follower.wait(min(remaining, 5.0))
+    finally:
+        follower.close()
+
+    if crash is not None:
+        return ServerReadiness(ready=False, error="\n".join(crash))
+    return ServerReadiness(ready=False)
@@ -1,26 +1,63 @@
+import atexit
 import functools
+import json
 import logging
-from logging.handlers import TimedRotatingFileHandler
+import math
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
-from discord import Interaction
+from discord import Interaction, app_commands
+
+from .metrics import InstrumentedInteraction, instrument_command, metrics
+from .ratelimit import RateLimiter
+
+# Listener que escribe en disco/consola desde su propio hilo.
+_listener: Optional[QueueListener] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formatea cada registro como un objeto JSON por línea. Los campos tipados se
+    pasan con `extra={"fields": {...}}` y se añaden tal cual al objeto.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
 
 def setup_command_logger():
-    """Configura y devuelve un logger para registrar el uso de comandos."""
+    """
+    Configura y devuelve un logger para registrar el uso de comandos.
+
+    El logger solo encola los registros (QueueHandler); un QueueListener en otro
+    hilo los escribe en `logs/command_usage.log` como JSON por línea, con
+    rotación diaria, y en la consola en texto legible. Así ni la escritura ni la
+    rotación ocurren en el bucle de eventos.
+    """
+    global _listener
     log_directory = "logs"
     Path(log_directory).mkdir(parents=True, exist_ok=True)
 
     logger = logging.getLogger("discord_commands")
     logger.setLevel(logging.INFO)
+    logger.propagate = False
 
-    log_format = logging.Formatter(
-        "%(asctime)s - [%(levelname)s] - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-    )
-
-    # Evita handlers duplicados
+    # Evita handlers y listeners duplicados
     if logger.hasHandlers():
         logger.handlers.clear()
+    if _listener is not None:
+        _listener.stop()
 
     # Handler para el archivo con rotacion diaria
     handler = TimedRotatingFileHandler(
@@ -30,51 +67,113 @@ def setup_command_logger():
         backupCount=7,
         encoding="utf-8",
     )
-    handler.setFormatter(log_format)
-    logger.addHandler(handler)
+    handler.setFormatter(JsonLinesFormatter())
 
     # Handler para la consola
     console_handler = logging.StreamHandler()
-    console_handler.setFormatter(log_format)
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(
+        logging.Formatter(
+            "%(asctime)s - [%(levelname)s] - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        )
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue, handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
 
     return logger
 
 
-def log_command_usage(logger: logging.Logger):
+def _plain(value):
+    """Reduce un valor de opción a algo serializable sin tocarlo desde otro hilo."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, app_commands.Choice):
+        return value.value
+    return getattr(value, "id", None) or str(value)
+
+
+# Cómo se nombra cada ámbito de límite en los mensajes.
+_SCOPE_NAMES = {"user": "tuyo", "guild": "de este servidor", "global_": "global"}
+
+
+def log_command_usage(
+    logger: logging.Logger, rate_limiter: Optional[RateLimiter] = None
+):
     """
-    Un decorador que registra la información de una interacción de comando.
+    Un decorador que registra la información de una interacción de comando,
+    junto con su latencia por fases y su resultado. Las fases también se
+    acumulan en los histogramas de `metrics`.
+
+    Con `rate_limiter`, los usos por encima del límite se rechazan antes de
+    ejecutar el comando, indicando cuándo se puede volver a intentar.
     """
 
     def decorator(func):
         @functools.wraps(func)
         async def wrapper(interaction: Interaction, *args, **kwargs):
-            # Extraer información de la interacción
-            user = interaction.user
             command_name = (
                 interaction.command.name if interaction.command else "unknown_command"
             )
-            guild = interaction.guild.name if interaction.guild else "Direct Message"
-            channel = (
-                getattr(interaction.channel, "name")
-                if hasattr(interaction.channel, "name")
-                else f"ID({interaction.channel_id})"
-            )
-
-            # Formatear los argumentos del comando
-            options = {k: v for k, v in interaction.namespace}
-
-            log_message = (
-                f"User: '{user}' (ID: {user.id}) | "
-                f"Guild: '{guild}' | Channel: '#{channel}' | "
-                f"Command: '/{command_name}' | "
-                f"Options: {options}"
-            )
-
-            logger.info(log_message)
-
-            # Ejecutar el comando original
-            return await func(interaction, *args, **kwargs)
+            outcome, error = "ok", None
+            timings: dict[str, float] = {}
+            try:
+                if rate_limiter is not None:
+                    retry_after, scope = rate_limiter.check(
+                        command_name, interaction.user.id, interaction.guild_id
+                    )
+                    if retry_after:
+                        outcome = "rate_limited"
+                        await interaction.response.send_message(
+                            f"Has alcanzado el límite de uso {_SCOPE_NAMES[scope]} de "
+                            f"`/{command_name}`. Inténtalo de nuevo en "
+                            f"{math.ceil(retry_after)} s.",
+                            ephemeral=True,
+                        )
+                        return
+
+                # Ejecutar el comando original, midiendo cada fase
+                with instrument_command(command_name) as timings:
+                    return await func(
+                        InstrumentedInteraction(interaction), *args, **kwargs
+                    )
+            except Exception as e:
+                outcome, error = "error", repr(e)
+                raise
+            finally:
+                metrics.count_outcome(command_name, outcome)
+                latency = timings.get("total", 0.0)
+                user = interaction.user
+                user_name = str(user)
+                # Solo se reúnen valores primitivos; el formateo ocurre en el listener.
+                logger.info(
+                    "/%s por %s: %s (%.0f ms)",
+                    command_name,
+                    user_name,
+                    outcome,
+                    latency * 1000,
+                    extra={
+                        "fields": {
+                            "user_id": user.id,
+                            "user": user_name,
+                            "guild_id": interaction.guild_id,
+                            "channel_id": interaction.channel_id,
+                            "command": command_name,
+                            "options": {k: _plain(v) for k, v in interaction.namespace},
+                            "latency_ms": round(latency * 1000, 3),
+                            "phases_ms": {
+                                name: round(seconds * 1000, 3)
+                                for name, seconds in timings.items()
+                            },
+                            "outcome": outcome,
+                            "error": error,
+                        }
+                    },
+                )
 
         return wrapper
 
@@ -0,0 +1,255 @@
+import asyncio
+import bisect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (en segundos) de los cubos de los histogramas.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Tiempos por fase del comando que se está ejecutando en esta tarea.
+_current_timings: ContextVar[Optional[dict[str, float]]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+class Histogram:
+    """Histograma de cubos fijos, con el mismo formato que usa Prometheus."""
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # el último cubo es +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimación del cuantil: el límite superior del cubo donde cae."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Histogramas de latencia por comando y fase, y contadores de resultados."""
+
+    def __init__(self):
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.outcomes: dict[tuple[str, str], int] = {}
+        self.started_at = time.time()
+        # Funciones que añaden líneas propias al formato de Prometheus.
+        self.collectors: list[Callable[[], list[str]]] = []
+
+    def add_collector(self, collector: Callable[[], list[str]]):
+        """Registra `collector`, que devuelve líneas extra en formato Prometheus."""
+        self.collectors.append(collector)
+
+    def observe(self, command: str, phase: str, seconds: float):
+        histogram = self.histograms.get((command, phase))
+        if histogram is None:
+            histogram = self.histograms[(command, phase)] = Histogram()
+        histogram.observe(seconds)
+
+    def count_outcome(self, command: str, outcome: str):
+        key = (command, outcome)
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """Devuelve las métricas en el formato de texto de Prometheus."""
+        lines = [
+            "# HELP servercontrol_command_phase_seconds Duración de cada fase de un comando.",
+            "# TYPE servercontrol_command_phase_seconds histogram",
+        ]
+        for (command, phase), histogram in sorted(self.histograms.items()):
+            labels = f'command="{command}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(
+                    f'servercontrol_command_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'servercontrol_command_phase_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}'
+            )
+            lines.append(
+                f"servercontrol_command_phase_seconds_sum{{{labels}}} {histogram.sum}"
+            )
+            lines.append(
+                f"servercontrol_command_phase_seconds_count{{{labels}}} {histogram.count}"
+            )
+
+        lines.append(
+            "# HELP servercontrol_commands_total Comandos ejecutados por resultado."
+        )
+        lines.append("# TYPE servercontrol_commands_total counter")
+        for (command, outcome), count in sorted(self.outcomes.items()):
+            lines.append(
+                f'servercontrol_commands_total{{command="{command}",outcome="{outcome}"}} {count}'
+            )
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Suma el tiempo del bloque a la fase `name` del comando en curso. Fuera de un
+    comando instrumentado no hace nada.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+
+class _TimedProxy:
+    """Delega en `target` y cronometra los métodos asíncronos indicados."""
+
+    def __init__(self, target: Any, methods: dict[str, str]):
+        self._target = target
+        self._methods = methods
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        phase_name = self._methods.get(name)
+        if phase_name is None:
+            return attr
+
+        async def timed(*args, **kwargs):
+            with phase(phase_name):
+                return await attr(*args, **kwargs)
+
+        return timed
+
+
+class InstrumentedInteraction:
+    """
+    Envoltorio de una Interaction que mide cuánto tardan `response.defer`,
+    `response.send_message` y `followup.send` sin tocar los comandos.
+    """
+
+    def __init__(self, interaction: Any):
+        self._interaction = interaction
+        self.response = _TimedProxy(
+            interaction.response, {"defer": "defer", "send_message": "response"}
+        )
+        self.followup = _TimedProxy(interaction.followup, {"send": "followup"})
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._interaction, name)
+
+
+# Fases que ocurren fuera del código del comando en sí.
+DISCORD_PHASES = ("defer", "response", "followup")
+
+
+@contextmanager
+def instrument_command(command: str):
+    """
+    Mide un comando completo. Al terminar registra la duración total, cada fase
+    con tiempo y `backend`: el tiempo que no se pasó hablando con Discord.
+    Entrega el diccionario de tiempos para que el llamador pueda registrarlo.
+    """
+    timings: dict[str, float] = {}
+    token = _current_timings.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+        total = time.perf_counter() - start
+        timings["backend"] = total - sum(timings.get(p, 0.0) for p in DISCORD_PHASES)
+        timings["total"] = total
+        for name, seconds in timings.items():
+            metrics.observe(command, name, seconds)
+
+
+async def _handle_metrics_request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+):
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 5)
+        while (await asyncio.wait_for(reader.readline(), 5)) not in (
+            b"\r\n",
+            b"\n",
+            b"",
+        ):
+            pass  # cabeceras
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1] == "/metrics":
+            status = "200 OK"
+            body = metrics.render_prometheus().encode("utf-8")
+        else:
+            status, body = "404 Not Found", b"Not Found\n"
+        header = (
+            f"HTTP/1.1 {status}\r\n"
+            "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(header.encode("latin-1") + body)
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int) -> asyncio.AbstractServer:
+    """Sirve `/metrics` en formato Prometheus, solo en 127.0.0.1."""
+    server = await asyncio.start_server(_handle_metrics_request, "127.0.0.1", port)
+    logger.info("Métricas disponibles en http://127.0.0.1:%d/metrics", port)
+    return server
+
+
+# Servidores de métricas abiertos y tareas que los están abriendo.
+_metrics_servers: list[asyncio.AbstractServer] = []
+_metrics_tasks: set[asyncio.Task] = set()
+
+
+def start_metrics_server_task(port: int) -> asyncio.Task:
+    """
+    Abre el servidor de métricas en segundo plano. Si falla (p. ej. el puerto ya
+    está en uso), se registra el error en lugar de perderse con la tarea.
+    """
+
+    def done(task: asyncio.Task):
+        _metrics_tasks.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error(
+                "No se pudo abrir el servidor de métricas en el puerto %d",
+                port,
+                exc_info=task.exception(),
+            )
+        else:
+            _metrics_servers.append(task.result())
+
+    task = asyncio.get_running_loop().create_task(start_metrics_server(port))
+    _metrics_tasks.add(task)
+    task.add_done_callback(done)
+    return task
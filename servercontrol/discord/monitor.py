@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from .enums import ServerStatus
+
+logger = logging.getLogger(__name__)
+
+StatusListener = Callable[[ServerStatus, ServerStatus], Awaitable[None]]
+
+# Estados en los que el servidor está cambiando y conviene sondear rápido.
+TRANSITIONAL_STATES = (ServerStatus.STARTING, ServerStatus.STOPPING)
+
+
+class ServerMonitor:
+    """
+    Sigue el estado del servidor en segundo plano.
+
+    Mantiene la máquina de estados OFFLINE → STARTING → ONLINE → STOPPING → OFFLINE
+    con sondeo adaptativo: rápido durante las transiciones y justo después de
+    /server_start o /server_stop, lento cuando el estado es estable. Los comandos
+    leen `status` sin sondear, y otros componentes pueden suscribirse a los cambios.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[ServerStatus]],
+        fast_interval: float = 2.0,
+        slow_interval: float = 30.0,
+        fast_window: float = 60.0,
+        transition_timeout: float = 300.0,
+    ):
+        self._probe = probe
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.fast_window = fast_window
+        self.transition_timeout = transition_timeout
+        self.status = ServerStatus.UNKNOWN
+        self.changed_at = time.monotonic()
+        self.last_probe_at: Optional[float] = None
+        self._listeners: list[StatusListener] = []
+        # Notificaciones en curso; se guardan para que no las recoja el GC.
+        self._notifications: set[asyncio.Task] = set()
+        self._fast_until = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Arranca la tarea de sondeo en el bucle de eventos actual."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Detiene la tarea de sondeo."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def subscribe(self, listener: StatusListener) -> Callable[[], None]:
+        """
+        Registra `listener(anterior, nuevo)` para cada transición.
+        Devuelve una función que cancela la suscripción.
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def notify_starting(self):
+        """Indica que se acaba de lanzar el servidor."""
+        self._transition(ServerStatus.STARTING)
+        self._poll_fast()
+
+    def notify_stopping(self):
+        """Indica que se acaba de enviar la orden de apagado."""
+        self._transition(ServerStatus.STOPPING)
+        self._poll_fast()
+
+    def _poll_fast(self):
+        self._fast_until = time.monotonic() + self.fast_window
+        self._wakeup.set()
+
+    def _next_state(self, probed: ServerStatus) -> ServerStatus:
+        """Calcula el nuevo estado a partir del actual y del resultado del sondeo."""
+        current = self.status
+        timed_out = time.monotonic() - self.changed_at > self.transition_timeout
+
+        if current == ServerStatus.STARTING and not timed_out:
+            # Mientras arranca, RCON aún no responde: solo ONLINE cierra la transición.
+            return ServerStatus.ONLINE if probed == ServerStatus.ONLINE else current
+        if current == ServerStatus.STOPPING and not timed_out:
+            # Mientras se apaga, RCON puede seguir respondiendo unos segundos.
+            return ServerStatus.OFFLINE if probed == ServerStatus.OFFLINE else current
+        if probed == ServerStatus.UNKNOWN and current != ServerStatus.UNKNOWN:
+            # Un sondeo fallido no basta para olvidar el último estado conocido.
+            return current
+        return probed
+
+    def _transition(self, new: ServerStatus):
+        old = self.status
+        if new == old:
+            return
+        self.status = new
+        self.changed_at = time.monotonic()
+        logger.info("Estado del servidor: %s -> %s", old.value, new.value)
+        for listener in list(self._listeners):
+            task = asyncio.get_running_loop().create_task(
+                self._notify(listener, old, new)
+            )
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    async def _notify(
+        self, listener: StatusListener, old: ServerStatus, new: ServerStatus
+    ):
+        try:
+            await listener(old, new)
+        except Exception:
+            logger.exception("Error en un suscriptor del monitor de estado")
+
+    def _interval(self) -> float:
+        if self.status in TRANSITIONAL_STATES or time.monotonic() < self._fast_until:
+            return self.fast_interval
+        return self.slow_interval
+
+    async def _run(self):
+        while True:
+            try:
+                probed = await self._probe()
+                self.last_probe_at = time.monotonic()
+                self._transition(self._next_state(probed))
+            except Exception:
+                logger.exception("Error al sondear el estado del servidor")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._interval())
+            except asyncio.TimeoutError:
+                pass
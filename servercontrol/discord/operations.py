@@ -0,0 +1,69 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from .log_watcher import ServerReadiness
+
+
+@dataclass
+class OperationOutcome:
+    """
+    Resultado de una operación de ciclo de vida del servidor. Se comparte entre
+    todas las interacciones que la pidieron a la vez.
+    """
+
+    messages: list[str] = field(default_factory=list)
+    # Tarea que espera el final del arranque, si la operación lanzó el servidor.
+    readiness: Optional["asyncio.Task[ServerReadiness]"] = None
+
+
+class ServerOperationCoordinator:
+    """
+    Coordina las operaciones de ciclo de vida (arrancar, detener...) de cada servidor.
+
+    Las operaciones de un mismo servidor se ejecutan de una en una. Si llega una
+    petición de una operación que ya está en curso, no se repite: espera a la que
+    está en marcha y recibe el mismo OperationOutcome.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+
+    def is_running(self, server: str, operation: str) -> bool:
+        return (server, operation) in self._inflight
+
+    async def run(
+        self,
+        server: str,
+        operation: str,
+        action: Callable[[], Awaitable[OperationOutcome]],
+    ) -> tuple[OperationOutcome, bool]:
+        """
+        Ejecuta `action` con el servidor bloqueado, o se une a la misma operación
+        si ya está en curso. Devuelve (resultado, si se unió a una en curso).
+        """
+        key = (server, operation)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: si se cancela esta espera, la operación sigue para el resto.
+            return await asyncio.shield(inflight), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Evita el aviso de "exception was never retrieved" si nadie más esperaba.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            lock = self._locks.setdefault(server, asyncio.Lock())
+            async with lock:
+                outcome = await action()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(outcome)
+        return outcome, False
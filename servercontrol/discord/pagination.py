@@ -0,0 +1,36 @@
+# Límite de caracteres de un mensaje de Discord.
+DISCORD_MESSAGE_LIMIT = 2000
+# Margen para el bloque de código y el pie de página.
+PAGE_SIZE = 1900
+
+
+def escape_code_block(text: str) -> str:
+    """Evita que el texto cierre antes de tiempo un bloque de código."""
+    return text.replace("```", "`\u200b``")
+
+
+def paginate_lines(lines: list[str], limit: int = PAGE_SIZE) -> list[str]:
+    """
+    Agrupa líneas en páginas de como mucho `limit` caracteres sin partir líneas;
+    solo las líneas más largas que una página se cortan.
+    """
+    pages: list[str] = []
+    current: list[str] = []
+    size = 0
+    for line in lines:
+        line = escape_code_block(line)
+        if len(line) > limit and current:
+            # La página en curso va antes que los trozos de la línea larga.
+            pages.append("\n".join(current))
+            current, size = [], 0
+        while len(line) > limit:
+            pages.append(line[:limit])
+            line = line[limit:]
+        if size + len(line) + 1 > limit and current:
+            pages.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pages.append("\n".join(current))
+    return pages
@@ -0,0 +1,89 @@
+import bisect
+import re
+import time
+from typing import Iterable
+
+# Nombres de jugador de Java (3-16 caracteres) y de Bedrock vía Floodgate ('.').
+PLAYER_NAME_RE = re.compile(r"^\.?\w{1,16}$")
+# Respuesta de `list`: "There are 2 of a max of 20 players online: Steve, Alex".
+LIST_RE = re.compile(r"online:(.*)$", re.DOTALL | re.IGNORECASE)
+
+
+def parse_player_list(response: str) -> list[str]:
+    """Extrae los nombres de jugador de la respuesta del comando `list`."""
+    match = LIST_RE.search(response)
+    if match is None:
+        return []
+    return [
+        name
+        for name in re.split(r"[,\s]+", match.group(1))
+        if PLAYER_NAME_RE.match(name)
+    ]
+
+
+class PlayerCache:
+    """
+    Jugadores conectados y recientes de un servidor, para autocompletar nombres.
+
+    Los nombres se guardan en minúsculas en una lista ordenada, de modo que los
+    que empiezan por un prefijo son un tramo contiguo que se localiza con bisect.
+    Las consultas no hacen ninguna E/S: la caché se alimenta aparte, con los
+    sondeos de estado, el comando `list` y el índice de logs.
+    """
+
+    def __init__(self, scan_limit: int = 200):
+        self.scan_limit = scan_limit
+        self._keys: list[str] = []
+        self._names: dict[str, str] = {}
+        self._last_seen: dict[str, float] = {}
+        self.online: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, name: str, seen_at: float):
+        """Registra que `name` se vio en `seen_at` (marca de tiempo Unix)."""
+        key = name.lower()
+        if key not in self._names:
+            bisect.insort(self._keys, key)
+            self._names[key] = name
+        elif not name.islower():
+            # El índice de logs solo conoce minúsculas; se prefiere el nombre real.
+            self._names[key] = name
+        if seen_at > self._last_seen.get(key, 0.0):
+            self._last_seen[key] = seen_at
+
+    def set_online(self, names: Iterable[str]):
+        """Reemplaza la lista de jugadores conectados."""
+        now = time.time()
+        online = set()
+        for name in names:
+            self.add(name, now)
+            online.add(name.lower())
+        self.online = online
+
+    def mark_seen(self, names: Iterable[str]):
+        """Registra jugadores conectados sin dar la lista por completa."""
+        now = time.time()
+        for name in names:
+            self.add(name, now)
+            self.online.add(name.lower())
+
+    def complete(self, prefix: str, limit: int = 25) -> list[str]:
+        """
+        Nombres que empiezan por `prefix`: primero los conectados y después los
+        vistos más recientemente. Se examinan como mucho `scan_limit` nombres.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, prefix)
+        end = min(start + self.scan_limit, len(self._keys))
+        keys = {key for key in self.online if key.startswith(prefix)}
+        for i in range(start, end):
+            if not self._keys[i].startswith(prefix):
+                break
+            keys.add(self._keys[i])
+        ranked = sorted(
+            keys,
+            key=lambda key: (key not in self.online, -self._last_seen.get(key, 0.0)),
+        )
+        return [self._names[key] for key in ranked[:limit]]
@@ -0,0 +1,121 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`calls` usos cada `period` segundos, con ráfagas de hasta `calls`."""
+
+    calls: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.calls / self.period
+
+
+@dataclass(frozen=True)
+class CommandLimits:
+    """Límites de un comando por usuario, por servidor (guild) y globales."""
+
+    user: Optional[RateLimit] = None
+    guild: Optional[RateLimit] = None
+    global_: Optional[RateLimit] = None
+
+
+class TokenBucket:
+    """Cubo de tokens que se rellena de forma continua según su límite."""
+
+    __slots__ = ("limit", "tokens", "updated_at")
+
+    def __init__(self, limit: RateLimit, now: float):
+        self.limit = limit
+        self.tokens = float(limit.calls)
+        self.updated_at = now
+
+    def refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.limit.calls, self.tokens + elapsed * self.limit.rate)
+        self.updated_at = now
+
+    def retry_after(self) -> float:
+        """Segundos hasta que haya un token disponible (0 si ya lo hay)."""
+        return max(0.0, (1 - self.tokens) / self.limit.rate)
+
+    def is_full(self) -> bool:
+        return self.tokens >= self.limit.calls
+
+
+# Ámbitos en el orden en que se comprueban.
+SCOPES = ("user", "guild", "global_")
+
+
+class RateLimiter:
+    """
+    Limita el uso de comandos con cubos de tokens por usuario, servidor y global.
+
+    Un uso solo se cuenta si hay token en todos los ámbitos del comando, para
+    que un usuario limitado no consuma el cupo del servidor. Los cubos se crean
+    al usarse y, cada `sweep_interval` segundos, se eliminan los que se han
+    vuelto a llenar: un cubo lleno equivale a no tener cubo.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, CommandLimits],
+        default: CommandLimits = CommandLimits(),
+        sweep_interval: float = 300.0,
+    ):
+        self.limits = limits
+        self.default = default
+        self.sweep_interval = sweep_interval
+        self._buckets: dict[tuple[str, str, Optional[int]], TokenBucket] = {}
+        self._last_sweep = time.monotonic()
+
+    def _bucket(
+        self, command: str, scope: str, key: Optional[int], limit: RateLimit, now: float
+    ) -> TokenBucket:
+        bucket_key = (command, scope, key)
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._buckets[bucket_key] = TokenBucket(limit, now)
+        else:
+            bucket.refill(now)
+        return bucket
+
+    def check(
+        self, command: str, user_id: int, guild_id: Optional[int]
+    ) -> tuple[float, Optional[str]]:
+        """
+        Intenta consumir un uso de `command`. Devuelve (0, None) si se permite, o
+        los segundos que hay que esperar y el ámbito que lo impide.
+        """
+        now = time.monotonic()
+        if now - self._last_sweep > self.sweep_interval:
+            self._sweep(now)
+
+        limits = self.limits.get(command, self.default)
+        keys = {"user": user_id, "guild": guild_id, "global_": None}
+        buckets = []
+        for scope in SCOPES:
+            limit: Optional[RateLimit] = getattr(limits, scope)
+            if limit is None or (scope == "guild" and guild_id is None):
+                continue
+            bucket = self._bucket(command, scope, keys[scope], limit, now)
+            wait = bucket.retry_after()
+            if wait > 0:
+                return wait, scope
+            buckets.append(bucket)
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return 0.0, None
+
+    def _sweep(self, now: float):
+        """Elimina los cubos inactivos que ya se han rellenado por completo."""
+        for key, bucket in list(self._buckets.items()):
+            bucket.refill(now)
+            if bucket.is_full():
+                del self._buckets[key]
+        self._last_sweep = now
@@ -1,7 +1,15 @@
 import asyncio
+import codecs
 import random
+import re
 import socket
 import struct
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Sequence
+
+from .metrics import phase
 
 
 class RCONConnectionError(Exception):
@@ -26,21 +34,117 @@ class RCONAuthError(Exception):
 # 2: SERVERDATA_EXECCOMMAND (para enviar un comando).
 # 0: SERVERDATA_RESPONSE_VALUE (la respuesta del servidor a un comando).
 # 2: SERVERDATA_AUTH_RESPONSE (la respuesta del servidor a la autenticación).
-# Payload: Los datos en sí (la contraseña o el comando), codificados en ASCII.
+# Payload: Los datos en sí (la contraseña o el comando), codificados en UTF-8.
 # Terminador: Dos bytes nulos (\x00\x00) para marcar el final.
 # Para comunicarse, envías un paquete al servidor y luego lees su respuesta, que sigue el mismo formato.
+# Las respuestas largas (unos 4096 bytes o más) llegan partidas en varios paquetes con el mismo ID.
+
+_COLOR_CODE_RE = re.compile("§.", re.DOTALL)
+
+# Cabecera completa: Longitud, ID de Petición y Tipo (little-endian).
+_HEADER = struct.Struct("<iii")
+# Bytes contados en la Longitud además del payload: ID + Tipo + Terminador.
+_BODY_OVERHEAD = 10
+
+
+class RCONPacketEncoder:
+    """
+    Acumula un lote de paquetes RCON para enviarlo con una sola escritura.
+
+    La cabecera completa (Longitud, ID y Tipo) se empaqueta con una única llamada
+    a struct, y el lote se une una sola vez al vaciarse.
+    """
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+
+    def add(self, req_id: int, req_type: int, payload: bytes):
+        """Añade un paquete al final del lote."""
+        header = _HEADER.pack(len(payload) + _BODY_OVERHEAD, req_id, req_type)
+        self._parts.append(header + payload + b"\x00\x00")
+
+    def flush(self) -> bytes:
+        """Devuelve el lote acumulado y vacía el codificador."""
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+class RCONFrameReader:
+    """
+    Lee paquetes RCON de un StreamReader a través de un buffer propio.
+
+    Cada lectura trae todo lo disponible en el socket (varios paquetes de una vez
+    si los hay) y las cabeceras se analizan in situ con `struct.unpack_from`; solo
+    se copia el payload de cada paquete.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, read_size: int = 65536):
+        self._reader = reader
+        self._read_size = read_size
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def _parse_frame(self) -> Optional[tuple[int, int, bytes]]:
+        """Extrae un paquete completo del buffer, o devuelve None si aún falta algo."""
+        buffer, offset = self._buffer, self._offset
+        if len(buffer) - offset < _HEADER.size:
+            return None
+        packet_len, req_id, res_type = _HEADER.unpack_from(buffer, offset)
+        end = offset + 4 + packet_len
+        if len(buffer) < end:
+            return None
+
+        with memoryview(buffer) as view:
+            payload = bytes(view[offset + _HEADER.size : end - 2])
+        self._offset = end
+        return req_id, res_type, payload
+
+    async def read_frame(self) -> tuple[int, int, bytes]:
+        """Devuelve el siguiente paquete (ID, Tipo, payload), leyendo del socket si hace falta."""
+        while (frame := self._parse_frame()) is None:
+            # Compacta antes de crecer para que el buffer no aumente sin límite.
+            if self._offset:
+                del self._buffer[: self._offset]
+                self._offset = 0
+            data = await self._reader.read(self._read_size)
+            if not data:
+                raise asyncio.IncompleteReadError(bytes(self._buffer), None)
+            self._buffer += data
+        return frame
 
 
 class SimpleRCONClient:
-    """Un cliente RCON asíncrono y minimalista para Minecraft."""
+    """
+    Un cliente RCON asíncrono y minimalista para Minecraft.
+
+    Por defecto cada comando espera su respuesta antes de enviar el siguiente, por
+    lo que una instancia no debe compartirse entre corrutinas. Con `multiplex=True`
+    una tarea de fondo lee las respuestas y las entrega a cada petición según su ID,
+    lo que permite tener muchos comandos en vuelo sobre el mismo socket.
+    """
 
-    def __init__(self, host: str, port: int, password: str, timeout: int = 5):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        timeout: int = 5,
+        multiplex: bool = False,
+    ):
         self.host = host
         self.port = port
         self.password = password
         self.timeout = timeout
+        self.multiplex = multiplex
         self._reader = None
         self._writer = None
+        self._frames: Optional[RCONFrameReader] = None
+        self._encoder = RCONPacketEncoder()
+        self._request_id = random.randint(0, 2**31 - 2)
+        self._pending: dict[int, _PendingResponse] = {}
+        self._sentinels: dict[int, _PendingResponse] = {}
+        self._dispatcher: Optional[asyncio.Task] = None
 
     async def __aenter__(self):
         """Permite el uso con 'async with'."""
@@ -49,39 +153,50 @@ class SimpleRCONClient:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Cierra la conexión al salir del bloque 'async with'."""
-        if self._writer:
-            self._writer.close()
-            await self._writer.wait_closed()
-
-    def _create_packet(self, req_id: int, req_type: int, payload: str) -> bytes:
-        """Construye un paquete RCON en el formato de bytes correcto."""
-        payload_bytes = payload.encode("ascii")
-        # Formato: < (little-endian), i (entero de 4 bytes)
-        # Paquete: ID, Tipo, Payload, Terminador (2 bytes nulos)
-        packet_data = struct.pack("<ii", req_id, req_type) + payload_bytes + b"\x00\x00"
-        # Longitud total del paquete (sin incluir el campo de longitud en sí)
-        packet_len = len(packet_data)
-        # Paquete final con la longitud al principio
-        return struct.pack("<i", packet_len) + packet_data
-
-    async def _read_response(self) -> tuple[int, str]:
-        """Lee y decodifica una respuesta del servidor."""
-        # Lee los primeros 4 bytes para obtener la longitud del paquete
-        len_data = await asyncio.wait_for(self._reader.readexactly(4), self.timeout)  # type: ignore
-        packet_len = struct.unpack("<i", len_data)[0]
-
-        # Lee el resto del paquete
-        packet_data = await asyncio.wait_for(
-            self._reader.readexactly(packet_len), self.timeout  # type: ignore
-        )
+        await self.close()
+
+    @property
+    def is_connected(self) -> bool:
+        """Indica si el socket sigue abierto y el servidor no ha cerrado su extremo."""
+        if self._writer is None or self._reader is None:
+            return False
+        if self._dispatcher is not None and self._dispatcher.done():
+            return False
+        return not self._writer.is_closing() and not self._reader.at_eof()
 
-        # Desempaqueta el ID y el Tipo
-        req_id, res_type = struct.unpack("<ii", packet_data[:8])
+    async def close(self):
+        """Cierra la conexión si está abierta."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        self._fail_pending(RCONConnectionError("La conexión RCON se cerró."))
 
-        # El payload es el resto, menos los 2 bytes nulos del final
-        payload = packet_data[8:-2].decode("ascii", errors="ignore")
+        writer, self._writer, self._reader = self._writer, None, None
+        self._frames = None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            # El servidor ya cerró la conexión (p. ej. tras un reinicio).
+            pass
+
+    def _next_request_id(self) -> int:
+        """Devuelve un ID de petición positivo (-1 lo reserva el servidor para errores de auth)."""
+        self._request_id = self._request_id % (2**31 - 1) + 1
+        return self._request_id
+
+    async def _read_packet(self) -> tuple[int, int, bytes]:
+        """
+        Lee un paquete del servidor, sin límite de tiempo. El payload se devuelve
+        sin decodificar: un carácter UTF-8 puede quedar partido entre dos fragmentos.
+        """
+        return await self._frames.read_frame()  # type: ignore
 
-        return res_type, payload
+    async def _read_response(self) -> tuple[int, int, bytes]:
+        """Lee una respuesta del servidor respetando el timeout del cliente."""
+        return await asyncio.wait_for(self._read_packet(), self.timeout)
 
     async def connect(self):
         """Establece la conexión y se autentica."""
@@ -89,6 +204,7 @@ class SimpleRCONClient:
             self._reader, self._writer = await asyncio.wait_for(
                 asyncio.open_connection(self.host, self.port), self.timeout
             )
+            self._frames = RCONFrameReader(self._reader)
         except (asyncio.TimeoutError, ConnectionRefusedError, socket.gaierror) as e:
             raise RCONConnectionError(
                 f"No se pudo conectar a {self.host}:{self.port}: {e}"
@@ -96,34 +212,360 @@ class SimpleRCONClient:
 
         await self._authenticate()
 
+        if self.multiplex:
+            self._dispatcher = asyncio.create_task(self._dispatch_responses())
+
     async def _authenticate(self):
         """Envía el paquete de autenticación."""
-        auth_id = random.randint(0, 2**31 - 1)
-        auth_packet = self._create_packet(auth_id, 3, self.password)
-        self._writer.write(auth_packet)  # type: ignore
+        auth_id = self._next_request_id()
+        self._encoder.add(auth_id, 3, self.password.encode("utf-8"))
+        self._writer.write(self._encoder.flush())  # type: ignore
         await self._writer.drain()  # type: ignore
 
         # Minecraft responde con un paquete de tipo 2 (SERVERDATA_AUTH_RESPONSE)
         # y un ID de -1 si la autenticación falla.
-        res_type, _ = await self._read_response()
+        req_id, res_type, _ = await self._read_response()
         if res_type != 2:  # No es una respuesta de autenticación
             raise RCONAuthError(
                 "El servidor no respondió correctamente a la autenticación."
             )
+        if req_id == -1:
+            raise RCONAuthError("Contraseña RCON incorrecta.")
+
+    def _route_packet(self, req_id: int, payload: bytes):
+        """Entrega un paquete recibido al comando que lo espera según su ID."""
+        pending = self._pending.get(req_id)
+        if pending is not None:
+            pending.chunks.put_nowait(payload)
+            return
+
+        # La respuesta al centinela marca el final de la respuesta del comando.
+        pending = self._sentinels.pop(req_id, None)
+        if pending is not None:
+            self._pending.pop(pending.req_id, None)
+            pending.chunks.put_nowait(None)
+
+        # Cualquier otro ID (p. ej. de un comando abandonado) se descarta.
+
+    async def _dispatch_responses(self):
+        """
+        Tarea de fondo del modo multiplexado: entrega cada respuesta a la
+        petición que espera ese ID.
+        """
+        try:
+            while True:
+                req_id, _, payload = await self._read_packet()
+                self._route_packet(req_id, payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Conexión perdida: las peticiones en vuelo reciben el error original.
+            self._fail_pending(e)
+
+    def _fail_pending(self, exc: BaseException):
+        """Propaga `exc` a todas las peticiones pendientes."""
+        pending = list(self._pending.values())
+        self._pending, self._sentinels = {}, {}
+        for response in pending:
+            response.chunks.put_nowait(exc)
 
-    async def execute(self, command: str) -> str:
-        """Ejecuta un comando y devuelve la respuesta."""
+    def _send_commands(self, commands: Sequence[str]) -> list["_PendingResponse"]:
+        """
+        Escribe cada comando seguido de su paquete centinela y registra las respuestas.
+
+        El centinela es un paquete de tipo 0 (SERVERDATA_RESPONSE_VALUE), que el
+        servidor no sabe ejecutar y al que responde con el mismo ID. Como las
+        peticiones se procesan en orden, su respuesta llega después del último
+        fragmento del comando y delimita el final de la respuesta.
+        """
         if not self._writer:
             raise RCONConnectionError(
                 "No conectado. Llama a connect() primero o usa 'async with'."
             )
+        if self.multiplex and not self.is_connected:
+            raise RCONConnectionError(
+                f"Se perdió la conexión con {self.host}:{self.port}."
+            )
+
+        pendings = []
+        for command in commands:
+            pending = _PendingResponse(self._next_request_id(), self._next_request_id())
+            self._pending[pending.req_id] = pending
+            self._sentinels[pending.sentinel_id] = pending
+            self._encoder.add(pending.req_id, 2, command.encode("utf-8"))
+            self._encoder.add(pending.sentinel_id, 0, b"")
+            pendings.append(pending)
+        self._writer.write(self._encoder.flush())
+        return pendings
+
+    def _discard(self, pending: "_PendingResponse"):
+        """Deja de esperar una respuesta; sus fragmentos tardíos se descartarán."""
+        self._pending.pop(pending.req_id, None)
+        self._sentinels.pop(pending.sentinel_id, None)
+
+    async def _next_chunk(self, pending: "_PendingResponse") -> Optional[bytes]:
+        """
+        Devuelve el siguiente fragmento de la respuesta, o None al terminar.
+        No aplica timeout: lo hace quien llama, una sola vez por respuesta.
+        """
+        if self.multiplex:
+            item = await pending.chunks.get()
+        else:
+            # En modo exclusivo es quien espera el que lee del socket, repartiendo
+            # por el camino los paquetes de otros comandos del mismo lote.
+            while pending.chunks.empty():
+                req_id, _, payload = await self._read_packet()
+                self._route_packet(req_id, payload)
+            item = pending.chunks.get_nowait()
+
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    async def _collect(
+        self,
+        pending: "_PendingResponse",
+        strip_colors: bool,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Reensambla todos los fragmentos de una respuesta bajo un único timeout."""
+        chunks = await asyncio.wait_for(
+            self._collect_chunks(pending), timeout or self.timeout
+        )
+        text = b"".join(chunks).decode("utf-8", errors="replace")
+        return strip_color_codes(text) if strip_colors else text
 
-        cmd_id = random.randint(0, 2**31 - 1)
-        cmd_packet = self._create_packet(cmd_id, 2, command)
-        self._writer.write(cmd_packet)
-        await self._writer.drain()
+    async def _collect_chunks(self, pending: "_PendingResponse") -> list[bytes]:
+        """Acumula los fragmentos de una respuesta hasta su centinela."""
+        chunks = []
+        while (chunk := await self._next_chunk(pending)) is not None:
+            chunks.append(chunk)
+        return chunks
+
+    async def execute(
+        self,
+        command: str,
+        strip_colors: bool = False,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Ejecuta un comando y devuelve la respuesta completa, ya reensamblada."""
+        responses = await self.execute_many([command], strip_colors, timeout)
+        return responses[0]
+
+    async def execute_many(
+        self,
+        commands: Sequence[str],
+        strip_colors: bool = False,
+        timeout: Optional[float] = None,
+    ) -> list[str]:
+        """
+        Ejecuta varios comandos en lote y devuelve las respuestas en el mismo orden.
+
+        Todos los paquetes se escriben con un único drain(), de modo que el lote
+        cuesta aproximadamente un viaje de ida y vuelta en lugar de uno por comando.
+        `timeout` sustituye al del cliente para cada respuesta (p. ej. en comandos
+        lentos como `save-all flush`).
+        """
+        pendings = self._send_commands(commands)
+        try:
+            await self._writer.drain()  # type: ignore
+            if self.multiplex:
+                return list(
+                    await asyncio.gather(
+                        *(self._collect(p, strip_colors, timeout) for p in pendings)
+                    )
+                )
+            return [await self._collect(p, strip_colors, timeout) for p in pendings]
+        finally:
+            for pending in pendings:
+                self._discard(pending)
+
+    async def iter_execute(
+        self, command: str, strip_colors: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Ejecuta un comando y produce el texto de la respuesta a medida que llegan
+        sus fragmentos, sin acumular la salida completa en memoria.
+        """
+        pending = self._send_commands([command])[0]
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        carry = ""
+        try:
+            await self._writer.drain()  # type: ignore
+            while (
+                chunk := await asyncio.wait_for(self._next_chunk(pending), self.timeout)
+            ) is not None:
+                text = carry + decoder.decode(chunk)
+                if strip_colors:
+                    # Un '§' al final puede tener su código en el siguiente fragmento.
+                    text, carry = (text[:-1], "§") if text.endswith("§") else (text, "")
+                    text = strip_color_codes(text)
+                if text:
+                    yield text
+            text = carry + decoder.decode(b"", final=True)
+            if text:
+                yield text
+        finally:
+            self._discard(pending)
+
+
+class _PendingResponse:
+    """Fragmentos recibidos para un comando, hasta que llega la respuesta a su centinela."""
+
+    def __init__(self, req_id: int, sentinel_id: int):
+        self.req_id = req_id
+        self.sentinel_id = sentinel_id
+        # Cada elemento es un fragmento, None (fin de la respuesta) o una excepción.
+        self.chunks: asyncio.Queue = asyncio.Queue()
+
+
+def strip_color_codes(text: str) -> str:
+    """Elimina los códigos de formato de Minecraft (§ seguido de un carácter)."""
+    return _COLOR_CODE_RE.sub("", text)
+
+
+@dataclass
+class RCONPoolStats:
+    """Métricas acumuladas de un RCONPool."""
+
+    acquires: int = 0
+    reuses: int = 0
+    connections_created: int = 0
+    connections_discarded: int = 0
+    reconnects: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Fracción de adquisiciones servidas con una conexión ya autenticada."""
+        return self.reuses / self.acquires if self.acquires else 0.0
+
+    @property
+    def avg_wait(self) -> float:
+        """Tiempo medio (segundos) esperando un hueco libre en el pool."""
+        return self.total_wait / self.acquires if self.acquires else 0.0
+
+
+class RCONPool:
+    """
+    Pool de conexiones RCON autenticadas y persistentes.
+
+    Mantiene hasta `max_size` sesiones abiertas para no repetir la conexión TCP
+    y la autenticación en cada comando. Las conexiones inactivas se validan antes
+    de reutilizarse y, si el servidor se reinició, se reconecta de forma transparente.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        password: str,
+        max_size: int = 4,
+        timeout: int = 5,
+        idle_timeout: float = 300.0,
+    ):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.stats = RCONPoolStats()
+        self._idle: list[tuple[SimpleRCONClient, float]] = []
+        self._semaphore = asyncio.Semaphore(max_size)
+
+    async def _get_client(self) -> SimpleRCONClient:
+        """Devuelve una conexión sana del pool o abre una nueva."""
+        now = time.monotonic()
+        while self._idle:
+            client, last_used = self._idle.pop()
+            if client.is_connected and now - last_used < self.idle_timeout:
+                self.stats.reuses += 1
+                return client
+            self.stats.connections_discarded += 1
+            await client.close()
+
+        client = SimpleRCONClient(self.host, self.port, self.password, self.timeout)
+        await client.connect()
+        self.stats.connections_created += 1
+        return client
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[SimpleRCONClient]:
+        """Presta una conexión autenticada de forma exclusiva."""
+        start = time.perf_counter()
+        async with self._semaphore:
+            wait = time.perf_counter() - start
+            self.stats.acquires += 1
+            self.stats.total_wait += wait
+            self.stats.max_wait = max(self.stats.max_wait, wait)
+
+            client = await self._get_client()
+            try:
+                yield client
+            except BaseException:
+                # Tras un error el flujo puede quedar a medio leer: no se reutiliza.
+                self.stats.connections_discarded += 1
+                await client.close()
+                raise
+            else:
+                self._idle.append((client, time.monotonic()))
+
+    async def execute(
+        self, command: str, timeout: Optional[float] = None, retry: bool = True
+    ) -> str:
+        """
+        Ejecuta un comando usando una conexión del pool.
+
+        Si la conexión reutilizada resulta estar muerta (el servidor se reinició),
+        se descartan las conexiones inactivas y se reintenta una vez con una nueva.
+        El comando puede haber llegado al servidor antes del fallo, así que con
+        comandos que no sean idempotentes hay que pasar `retry=False`.
+        """
+        responses = await self.execute_many([command], timeout, retry)
+        return responses[0]
+
+    async def execute_many(
+        self,
+        commands: Sequence[str],
+        timeout: Optional[float] = None,
+        retry: bool = True,
+    ) -> list[str]:
+        """Ejecuta un lote de comandos sobre una sola conexión del pool."""
+        with phase("rcon"):
+            return await self._execute_many(commands, timeout, retry)
+
+    async def _execute_many(
+        self, commands: Sequence[str], timeout: Optional[float], retry: bool
+    ) -> list[str]:
+        try:
+            async with self.acquire() as client:
+                return await client.execute_many(commands, timeout=timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.stats.reconnects += 1
+            await self._close_idle()
+            if not retry:
+                raise RCONConnectionError(
+                    f"Se perdió la conexión con {self.host}:{self.port}: {e}. "
+                    "El comando puede haber llegado al servidor."
+                )
+
+        try:
+            async with self.acquire() as client:
+                return await client.execute_many(commands, timeout=timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            raise RCONConnectionError(
+                f"Se perdió la conexión con {self.host}:{self.port}: {e}"
+            )
 
-        res_type, payload = await self._read_response()
+    async def _close_idle(self):
+        """Cierra todas las conexiones inactivas."""
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            self.stats.connections_discarded += 1
+            await client.close()
 
-        # Nota: Algunos comandos (como 'list') pueden enviar una respuesta vacía primero.
-        return payload
+    async def close(self):
+        """Cierra las conexiones inactivas del pool."""
+        await self._close_idle()
@@ -0,0 +1,121 @@
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import discord
+
+from .pagination import paginate_lines
+
+
+@dataclass
+class RCONOutput:
+    """Salida de un comando RCON ya dividida en páginas."""
+
+    command: str
+    pages: list[str]
+    expires_at: float
+
+
+class RCONOutputCache:
+    """
+    Guarda por un tiempo la salida de los comandos `/rcon` para poder pasar de
+    página sin volver a ejecutarlos. Las entradas caducan a los `ttl` segundos y,
+    si hay más de `max_entries`, se descartan las más antiguas.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, RCONOutput] = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def put(self, command: str, output: str) -> tuple[int, RCONOutput]:
+        """Pagina `output`, lo guarda y devuelve su clave junto con la entrada."""
+        self._expire()
+        entry = RCONOutput(
+            command, paginate_lines(output.splitlines()), time.monotonic() + self.ttl
+        )
+        key = next(self._ids)
+        self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return key, entry
+
+    def get(self, key: int) -> Optional[RCONOutput]:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    def discard(self, key: int):
+        self._entries.pop(key, None)
+
+    def _expire(self):
+        """Elimina las entradas caducadas (las más antiguas están al principio)."""
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[key]
+
+
+def render_page(entry: RCONOutput, page: int) -> str:
+    footer = f"\nPágina {page + 1}/{len(entry.pages)}" if len(entry.pages) > 1 else ""
+    return f"```\n{entry.pages[page]}\n```{footer}"
+
+
+class RCONOutputView(discord.ui.View):
+    """
+    Botones para recorrer las páginas de una salida guardada en RCONOutputCache.
+    Cada pulsación lee la página de la caché; no se repite el comando.
+    """
+
+    def __init__(self, cache: RCONOutputCache, key: int, pages: int):
+        super().__init__(timeout=cache.ttl)
+        self.cache = cache
+        self.key = key
+        self.pages = pages
+        self.page = 0
+        self.message: Optional[discord.WebhookMessage] = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page >= self.pages - 1
+
+    async def _show(self, interaction: discord.Interaction, page: int):
+        entry = self.cache.get(self.key)
+        if entry is None:
+            self.stop()
+            await interaction.response.edit_message(
+                content="Esta salida ha caducado; vuelve a ejecutar el comando.",
+                view=None,
+            )
+            return
+        self.page = min(max(page, 0), len(entry.pages) - 1)
+        self._update_buttons()
+        await interaction.response.edit_message(
+            content=render_page(entry, self.page), view=self
+        )
+
+    @discord.ui.button(label="Anterior", style=discord.ButtonStyle.secondary)
+    async def previous(
+        self, interaction: discord.Interaction, button: discord.ui.Button
+    ):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(label="Siguiente", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        self.cache.discard(self.key)
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+import discord
+
+from .enums import ServerStatus
+from .guild_config import GuildConfigManager
+from .monitor import ServerMonitor
+from .status_probe import ServerPing
+
+logger = logging.getLogger(__name__)
+
+STATUS_COLORS = {
+    ServerStatus.ONLINE: discord.Color.green(),
+    ServerStatus.STARTING: discord.Color.orange(),
+    ServerStatus.STOPPING: discord.Color.orange(),
+    ServerStatus.OFFLINE: discord.Color.red(),
+    ServerStatus.UNKNOWN: discord.Color.light_grey(),
+}
+STATUS_LABELS = {
+    ServerStatus.ONLINE: "🟢 Online",
+    ServerStatus.STARTING: "🟠 Arrancando",
+    ServerStatus.STOPPING: "🟠 Apagándose",
+    ServerStatus.OFFLINE: "🔴 Offline",
+    ServerStatus.UNKNOWN: "⚪ Desconocido",
+}
+
+
+class StatusBoard:
+    """
+    Mensaje fijo en un canal con el estado del servidor, editado en el sitio.
+
+    Se actualiza cuando el monitor cambia de estado y, además, cada
+    `refresh_interval` segundos si cambió algo más (jugadores, MOTD...). Las
+    ediciones se agrupan: como mucho una cada `min_interval` segundos, y solo si
+    el contenido es distinto. El tiempo en línea usa una marca de tiempo relativa
+    de Discord, así que no necesita ediciones para avanzar. El ID del mensaje se
+    guarda en la configuración del servidor para reutilizarlo tras reiniciar.
+    Con varios servidores de Minecraft, cada uno tiene su tablero, con `name`.
+    """
+
+    def __init__(
+        self,
+        bot: discord.Client,
+        channel_id: int,
+        monitor: ServerMonitor,
+        last_ping: Callable[[], Optional[ServerPing]],
+        config_manager: GuildConfigManager,
+        name: Optional[str] = None,
+        min_interval: float = 10.0,
+        refresh_interval: float = 60.0,
+    ):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.monitor = monitor
+        self.last_ping = last_ping
+        self.config_manager = config_manager
+        self.name = name
+        self._message_key = (
+            f"status_board_message_id:{name}" if name else "status_board_message_id"
+        )
+        self.min_interval = min_interval
+        self.refresh_interval = refresh_interval
+        self._message: Optional[discord.Message] = None
+        self._guild_id = 0
+        self._rendered: Optional[dict] = None
+        self._last_edit = 0.0
+        self._online_since = (0.0, 0)
+        self._dirty = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+    def start(self):
+        """Arranca la tarea que mantiene el mensaje al día."""
+        if self._task is None or self._task.done():
+            self._unsubscribe = self.monitor.subscribe(self._on_status_change)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _on_status_change(self, old: ServerStatus, new: ServerStatus):
+        self._dirty.set()
+
+    def render(self) -> discord.Embed:
+        status = self.monitor.status
+        ping = self.last_ping() if status == ServerStatus.ONLINE else None
+        embed = discord.Embed(
+            title=(
+                f"Servidor de Minecraft: {self.name}"
+                if self.name
+                else "Servidor de Minecraft"
+            ),
+            description=f"> {ping.motd}" if ping and ping.motd else None,
+            color=STATUS_COLORS[status],
+        )
+        embed.add_field(name="Estado", value=STATUS_LABELS[status])
+        if status == ServerStatus.ONLINE:
+            # changed_at es monotónico: se convierte a hora de reloj una sola vez
+            # por transición, para que el contenido no varíe entre renderizados.
+            if self._online_since[0] != self.monitor.changed_at:
+                since = time.time() - (time.monotonic() - self.monitor.changed_at)
+                self._online_since = (self.monitor.changed_at, int(since))
+            embed.add_field(
+                name="En línea", value=f"desde <t:{self._online_since[1]}:R>"
+            )
+        if ping:
+            players = f"{ping.players_online}/{ping.players_max}"
+            if ping.player_sample:
+                players += "\n" + ", ".join(ping.player_sample[:20])
+            embed.add_field(name="Jugadores", value=players, inline=False)
+            embed.add_field(name="Versión", value=ping.version or "-")
+        return embed
+
+    async def _get_message(self, embed: discord.Embed) -> discord.Message:
+        """Recupera el mensaje guardado o publica uno nuevo con `embed`."""
+        channel = self.bot.get_channel(self.channel_id) or await self.bot.fetch_channel(
+            self.channel_id
+        )
+        self._guild_id = getattr(getattr(channel, "guild", None), "id", 0)
+        message_id = self.config_manager.get(self._guild_id, self._message_key)
+        if message_id is not None:
+            try:
+                return await channel.fetch_message(message_id)  # type: ignore
+            except discord.NotFound:
+                pass
+        message = await channel.send(embed=embed)  # type: ignore
+        self.config_manager.set(self._guild_id, **{self._message_key: message.id})
+        self._rendered = embed.to_dict()
+        self._last_edit = time.monotonic()
+        return message
+
+    async def _update(self):
+        embed = self.render()
+        rendered = embed.to_dict()
+        if rendered == self._rendered:
+            return
+        if self._message is None:
+            self._message = await self._get_message(embed)
+            if rendered == self._rendered:
+                return
+        try:
+            await self._message.edit(embed=embed)
+        except discord.NotFound:
+            # Alguien borró el mensaje: se publica otro en la siguiente vuelta.
+            self._message = self._rendered = None
+            self.config_manager.set(self._guild_id, **{self._message_key: None})
+            return
+        self._rendered = rendered
+        self._last_edit = time.monotonic()
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await self._update()
+            except (discord.HTTPException, OSError):
+                logger.exception("No se pudo actualizar el tablero de estado")
+
+            self._dirty.clear()
+            try:
+                await asyncio.wait_for(self._dirty.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            # Agrupa ráfagas de cambios en una sola edición.
+            wait = self._last_edit + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
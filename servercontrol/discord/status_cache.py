@@ -0,0 +1,58 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from .enums import ServerStatus
+
+
+class StatusCache:
+    """
+    Caché con TTL del estado del servidor y coalescencia de sondeos en vuelo.
+
+    Las peticiones concurrentes comparten un único sondeo y reciben el mismo
+    ServerStatus. Con `force=True` se ignora el valor cacheado, pero se sigue
+    compartiendo un sondeo que ya esté en curso.
+    """
+
+    def __init__(self, probe: Callable[[], Awaitable[ServerStatus]], ttl: float):
+        self._probe = probe
+        self.ttl = ttl
+        self._value: Optional[ServerStatus] = None
+        self._expires_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+
+    @property
+    def cached(self) -> Optional[ServerStatus]:
+        """Último estado conocido si aún no ha caducado."""
+        if self._value is not None and time.monotonic() < self._expires_at:
+            return self._value
+        return None
+
+    async def get(self, force: bool = False) -> ServerStatus:
+        """Devuelve el estado cacheado o lanza (o se une a) un sondeo."""
+        if not force:
+            cached = self.cached
+            if cached is not None:
+                return cached
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # shield: si un solicitante se cancela, el sondeo compartido continúa.
+        return await asyncio.shield(self._inflight)
+
+    def set(self, status: ServerStatus):
+        """Guarda un estado obtenido por otra vía (p. ej. un monitor)."""
+        self._value = status
+        self._expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self):
+        """Descarta el valor cacheado; el siguiente get() sondeará de nuevo."""
+        self._expires_at = 0.0
+
+    async def _refresh(self) -> ServerStatus:
+        try:
+            status = await self._probe()
+            self.set(status)
+            return status
+        finally:
+            self._inflight = None
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+class StatusProbeError(Exception):
+    """El servidor respondió algo que no es una respuesta de estado válida."""
+
+    pass
+
+
+@dataclass
+class ServerPing:
+    """Estado público del servidor obtenido con Server List Ping o Query."""
+
+    motd: str
+    version: str
+    players_online: int
+    players_max: int
+    player_sample: list[str] = field(default_factory=list)
+    protocol: Optional[int] = None
+    latency: float = 0.0
+    online: bool = True
+
+
+# --- Server List Ping (TCP) ---
+# Es lo que usa el cliente de Minecraft para la lista de servidores. Cada paquete es:
+# Longitud (VarInt) | ID de paquete (VarInt) | Datos
+# Se envían juntos el Handshake (ID 0x00, siguiente estado 1 = status) y la
+# Status Request (ID 0x00, sin datos); el servidor contesta con un JSON.
+
+
+def _varint(value: int) -> bytes:
+    """Codifica un entero en el formato VarInt de Minecraft."""
+    value &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+async def _read_varint(reader: asyncio.StreamReader) -> int:
+    result = 0
+    for shift in range(0, 35, 7):
+        (byte,) = await reader.readexactly(1)
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result
+    raise StatusProbeError("VarInt demasiado largo.")
+
+
+def _mc_packet(packet_id: int, data: bytes = b"") -> bytes:
+    body = _varint(packet_id) + data
+    return _varint(len(body)) + body
+
+
+def _flatten_chat(component: Any) -> str:
+    """Convierte un componente de chat (texto o JSON) en texto plano."""
+    if isinstance(component, str):
+        return component
+    if isinstance(component, list):
+        return "".join(_flatten_chat(part) for part in component)
+    if isinstance(component, dict):
+        return component.get("text", "") + "".join(
+            _flatten_chat(part) for part in component.get("extra", [])
+        )
+    return ""
+
+
+async def ping_server(host: str, port: int = 25565, timeout: float = 3) -> ServerPing:
+    """Consulta el estado con Server List Ping en un solo viaje de ida y vuelta."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port), timeout
+    )
+    try:
+        address = host.encode("utf-8")
+        handshake = (
+            _varint(-1)  # versión de protocolo: -1 = solo consulta de estado
+            + _varint(len(address))
+            + address
+            + struct.pack(">H", port)
+            + _varint(1)
+        )
+        writer.write(_mc_packet(0x00, handshake) + _mc_packet(0x00))
+        await writer.drain()
+
+        async def read_status() -> bytes:
+            await _read_varint(reader)  # longitud del paquete
+            if await _read_varint(reader) != 0x00:
+                raise StatusProbeError("Respuesta de estado inesperada.")
+            length = await _read_varint(reader)
+            return await reader.readexactly(length)
+
+        raw = await asyncio.wait_for(read_status(), timeout)
+    finally:
+        writer.close()
+
+    try:
+        status = json.loads(raw)
+        players = status.get("players", {})
+        version = status.get("version", {})
+        return ServerPing(
+            motd=_flatten_chat(status.get("description", "")),
+            version=version.get("name", ""),
+            protocol=version.get("protocol"),
+            players_online=int(players.get("online", 0)),
+            players_max=int(players.get("max", 0)),
+            player_sample=[p["name"] for p in players.get("sample", []) if "name" in p],
+            latency=time.perf_counter() - start,
+        )
+    except (ValueError, AttributeError, KeyError, TypeError) as e:
+        raise StatusProbeError(f"JSON de estado inválido: {e}")
+
+
+# --- Query (UDP) ---
+# Requiere enable-query=true en server.properties. Un handshake (tipo 9) devuelve
+# un challenge token válido unos 30 segundos; con él, una petición "full stat"
+# (tipo 0) devuelve pares clave/valor y la lista completa de jugadores. El token
+# se reutiliza para que cada consulta cueste un único viaje; si con él no hay
+# respuesta, se pide uno nuevo antes de dar el servidor por caído.
+
+_QUERY_MAGIC = b"\xfe\xfd"
+_CHALLENGE_TTL = 25.0
+_challenges: dict[tuple[str, int], tuple[int, float]] = {}
+
+
+class _QueryProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.responses: asyncio.Queue = asyncio.Queue()
+
+    def datagram_received(self, data: bytes, addr):
+        self.responses.put_nowait(data)
+
+    def error_received(self, exc: Exception):
+        self.responses.put_nowait(exc)
+
+
+async def _query_request(
+    protocol: _QueryProtocol, transport, req_type: int, session: int, payload: bytes
+) -> bytes:
+    transport.sendto(_QUERY_MAGIC + struct.pack(">bi", req_type, session) + payload)
+    while True:
+        data = await protocol.responses.get()
+        if isinstance(data, Exception):
+            raise data
+        if len(data) >= 5 and data[0] == req_type:
+            if struct.unpack_from(">i", data, 1)[0] == session:
+                return data[5:]
+
+
+def _parse_full_stat(data: bytes) -> tuple[dict[str, str], list[str]]:
+    # 11 bytes de relleno ("splitnum\x00\x80\x00"), pares clave\x00valor\x00
+    # hasta una clave vacía, 10 bytes de relleno ("\x01player_\x00\x00") y
+    # los nombres de los jugadores terminados en \x00 hasta uno vacío.
+    kv_part, _, players_part = data[11:].partition(b"\x00\x00\x01player_\x00\x00")
+    items = kv_part.decode("utf-8", errors="replace").split("\x00")
+    info = dict(zip(items[::2], items[1::2]))
+    names = players_part.decode("utf-8", errors="replace").split("\x00")
+    return info, [name for name in names if name]
+
+
+async def query_server(host: str, port: int = 25565, timeout: float = 3) -> ServerPing:
+    """Consulta el estado con el protocolo Query (UDP)."""
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        _QueryProtocol, remote_addr=(host, port)
+    )
+    try:
+        session = random.randint(0, 2**31 - 1) & 0x0F0F0F0F
+        key = (host, port)
+
+        async def full_stat(token: Optional[int]) -> bytes:
+            if token is None:
+                data = await _query_request(protocol, transport, 9, session, b"")
+                token = int(data.rstrip(b"\x00"))
+                _challenges[key] = (token, time.monotonic())
+            return await _query_request(
+                protocol,
+                transport,
+                0,
+                session,
+                struct.pack(">i", token) + b"\x00\x00\x00\x00",
+            )
+
+        token, obtained_at = _challenges.get(key, (None, 0.0))
+        if token is not None and time.monotonic() - obtained_at > _CHALLENGE_TTL:
+            token = None
+        deadline = time.monotonic() + timeout
+        try:
+            # Con un token guardado se deja la mitad del tiempo para repetir el
+            # handshake si el servidor no contesta.
+            data = await asyncio.wait_for(
+                full_stat(token), timeout / 2 if token is not None else timeout
+            )
+        except asyncio.TimeoutError:
+            _challenges.pop(key, None)
+            if token is None:
+                raise
+            # El servidor ignora las peticiones con un token que ya rotó (cada
+            # ~30 s) o que emitió antes de reiniciarse: se pide uno nuevo una vez
+            # antes de darlo por caído.
+            data = await asyncio.wait_for(full_stat(None), deadline - time.monotonic())
+    finally:
+        transport.close()
+
+    try:
+        info, players = _parse_full_stat(data)
+        return ServerPing(
+            motd=info.get("hostname", ""),
+            version=info.get("version", ""),
+            players_online=int(info.get("numplayers", 0)),
+            players_max=int(info.get("maxplayers", 0)),
+            player_sample=players,
+            latency=time.perf_counter() - start,
+        )
+    except ValueError as e:
+        raise StatusProbeError(f"Respuesta de Query inválida: {e}")
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import shlex
+import time
+from collections import deque
+from typing import Optional
+
+from .metrics import phase
+
+logger = logging.getLogger(__name__)
+
+_controller_instance = None
+
+
+class TmuxError(Exception):
+    """Un comando de tmux terminó con error."""
+
+    pass
+
+
+async def run_tmux(*args: str) -> tuple[int, str, str]:
+    """Ejecuta `tmux <args>` como subproceso asíncrono y devuelve (código, stdout, stderr)."""
+    process = await asyncio.create_subprocess_exec(
+        "tmux",
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    return (
+        process.returncode or 0,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+class TmuxController:
+    """
+    Controla tmux sin bloquear el bucle de eventos.
+
+    Mantiene una conexión persistente en modo control (`tmux -C`) enganchada a una
+    sesión auxiliar: los comandos se envían por su stdin y las respuestas llegan en
+    bloques %begin/%end. Las notificaciones %sessions-changed mantienen en memoria
+    el conjunto de sesiones, de modo que comprobar si una sesión existe no lanza
+    ningún proceso. Si el modo control no está disponible, cada comando se ejecuta
+    con `asyncio.create_subprocess_exec`.
+
+    La sesión auxiliar mantiene vivo el servidor de tmux mientras el bot esté activo.
+    """
+
+    def __init__(
+        self, control_session: str = "servercontrol", retry_interval: float = 60.0
+    ):
+        self.control_session = control_session
+        self.retry_interval = retry_interval
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        # Tareas lanzadas desde el lector; se guardan para que no las recoja el GC.
+        self._tasks: set[asyncio.Task] = set()
+        self._pending: deque[asyncio.Future] = deque()
+        self._sessions: Optional[set[str]] = None
+        self._failed_at: Optional[float] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def in_control_mode(self) -> bool:
+        """Indica si la conexión de control está activa y el conjunto de sesiones al día."""
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._sessions is not None
+        )
+
+    async def start(self) -> bool:
+        """
+        Abre la conexión en modo control si no lo está ya.
+        Devuelve False si no es posible; se reintenta pasado `retry_interval`.
+        """
+        if self.in_control_mode:
+            return True
+        if (
+            self._failed_at is not None
+            and time.monotonic() - self._failed_at < self.retry_interval
+        ):
+            return False
+
+        async with self._start_lock:
+            if self.in_control_mode:
+                return True
+            try:
+                await self._attach()
+                self._sessions = set(
+                    await self._send("list-sessions", "-F", "#{session_name}")
+                )
+            except (OSError, TmuxError) as e:
+                logger.warning("tmux en modo control no disponible: %s", e)
+                self._failed_at = time.monotonic()
+                await self.close()
+                return False
+
+        self._failed_at = None
+        return True
+
+    async def _attach(self):
+        target = f"={self.control_session}"
+        code, _, _ = await run_tmux("has-session", "-t", target)
+        if code != 0:
+            code, _, stderr = await run_tmux(
+                "new-session", "-d", "-s", self.control_session, "tail -f /dev/null"
+            )
+            if code != 0:
+                raise TmuxError(stderr.strip())
+
+        self._process = await asyncio.create_subprocess_exec(
+            "tmux",
+            "-C",
+            "attach-session",
+            "-t",
+            target,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    async def close(self):
+        """Cierra la conexión de control (la sesión auxiliar sigue existiendo)."""
+        self._sessions = None
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.stdin.close()  # type: ignore
+            try:
+                await asyncio.wait_for(process.wait(), 2)
+            except asyncio.TimeoutError:
+                process.kill()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        for task in list(self._tasks):
+            task.cancel()
+        self._fail_pending()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Lanza `coro` en segundo plano guardando la tarea y registrando sus fallos."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                "Error en una tarea del modo control de tmux",
+                exc_info=task.exception(),
+            )
+
+    def _fail_pending(self):
+        pending, self._pending = self._pending, deque()
+        for future in pending:
+            if not future.done():
+                future.set_exception(TmuxError("Se cerró la conexión de control."))
+
+    async def _read_loop(self):
+        """Lee la salida del modo control: respuestas a comandos y notificaciones."""
+        block: Optional[list[str]] = None
+        own_block = False
+        try:
+            while line := await self._process.stdout.readline():  # type: ignore
+                text = line.decode("utf-8", errors="replace").rstrip("\n")
+                if block is not None:
+                    if text.startswith(("%end ", "%error ")):
+                        # Solo los bloques con el flag 1 responden a comandos de
+                        # este cliente (el resto es, p. ej., el attach inicial).
+                        if own_block and self._pending:
+                            future = self._pending.popleft()
+                            if not future.done():
+                                future.set_result((text.startswith("%end"), block))
+                        block = None
+                    else:
+                        block.append(text)
+                elif text.startswith("%begin "):
+                    block = []
+                    own_block = text.split(" ")[-1] == "1"
+                elif text.startswith("%sessions-changed"):
+                    self._spawn(self._refresh_sessions())
+                elif text.startswith("%exit"):
+                    break
+        finally:
+            self._sessions = None
+            self._fail_pending()
+
+    async def _refresh_sessions(self):
+        try:
+            sessions = await self._send("list-sessions", "-F", "#{session_name}")
+        except TmuxError:
+            return
+        if self._sessions is not None:
+            self._sessions = set(sessions)
+
+    async def _send(self, *args: str) -> list[str]:
+        """Envía un comando por la conexión de control y espera su bloque de respuesta."""
+        if self._process is None or self._process.returncode is not None:
+            raise TmuxError("La conexión de control no está activa.")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        line = " ".join(shlex.quote(arg) for arg in args) + "\n"
+        self._process.stdin.write(line.encode("utf-8"))  # type: ignore
+        await self._process.stdin.drain()  # type: ignore
+
+        ok, output = await future
+        if not ok:
+            raise TmuxError("\n".join(output))
+        return output
+
+    async def execute(self, *args: str) -> list[str]:
+        """Ejecuta un comando de tmux por la vía más barata disponible."""
+        with phase("tmux"):
+            return await self._execute(*args)
+
+    async def _execute(self, *args: str) -> list[str]:
+        if await self.start():
+            return await self._send(*args)
+        code, stdout, stderr = await run_tmux(*args)
+        if code != 0:
+            raise TmuxError(stderr.strip())
+        return stdout.splitlines()
+
+    async def has_session(self, name: str) -> bool:
+        """Comprueba si existe una sesión con exactamente ese nombre."""
+        with phase("tmux"):
+            return await self._has_session(name)
+
+    async def _has_session(self, name: str) -> bool:
+        if await self.start():
+            return name in self._sessions  # type: ignore
+        code, _, _ = await run_tmux("has-session", "-t", f"={name}")
+        return code == 0
+
+    async def new_session(self, name: str, command: str):
+        """Crea una sesión desacoplada que ejecuta `command`."""
+        await self.execute("new-session", "-d", "-s", name, command)
+        if self._sessions is not None:
+            self._sessions.add(name)
+
+    async def send_keys(self, name: str, *keys: str):
+        """Envía pulsaciones de teclado al panel activo de la sesión."""
+        await self.execute("send-keys", "-t", f"={name}:", *keys)
+
+
+def get_tmux_controller() -> TmuxController:
+    """Devuelve el controlador de tmux compartido por todo el bot."""
+    global _controller_instance
+    if _controller_instance is None:
+        _controller_instance = TmuxController()
+    return _controller_instance